@@ -13,4 +13,7 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'college_site_new.settings')
 
+# Lets settings pick ASGI-safe defaults (no persistent DB connections)
+os.environ.setdefault('DJANGO_ASGI', 'True')
+
 application = get_asgi_application()
@@ -28,11 +28,14 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "portal",
+    "exams",
 ]
 
 MIDDLEWARE = [
+    "portal.middleware.RequestTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "portal.middleware.AsyncWhiteNoiseMiddleware",
+    "portal.db_router.ReplicaPinningMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -61,11 +64,21 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "college_site_new.wsgi.application"
 
+# Persistent connections and health checks. Connection pooling
+# (OPTIONS["pool"]) needs Django 5.1+; this project is on 5.0.
+# Under ASGI (asgi.py sets DJANGO_ASGI) requests run in short-lived
+# threads, so persistent connections are not reused and pile up;
+# Django advises CONN_MAX_AGE = 0 there, so that is the default.
+SERVING_ASGI = os.environ.get("DJANGO_ASGI", "False") == "True"
+DATABASE_CONN_MAX_AGE = int(os.environ.get("DATABASE_CONN_MAX_AGE", "0" if SERVING_ASGI else "600"))
+DATABASE_CONN_HEALTH_CHECKS = os.environ.get("DATABASE_CONN_HEALTH_CHECKS", "True") == "True"
+
 # Database (Render PostgreSQL + local SQLite fallback)
 if os.environ.get("DATABASE_URL"):
     DATABASES = {
         "default": dj_database_url.config(
-            conn_max_age=600,
+            conn_max_age=DATABASE_CONN_MAX_AGE,
+            conn_health_checks=DATABASE_CONN_HEALTH_CHECKS,
             ssl_require=True,
         )
     }
@@ -77,6 +90,26 @@ else:
         }
     }
 
+# Optional read replica for dashboards, transcripts and reporting commands
+if os.environ.get("DATABASE_REPLICA_URL"):
+    replica_url = os.environ["DATABASE_REPLICA_URL"]
+    DATABASES["replica"] = dj_database_url.parse(
+        replica_url,
+        conn_max_age=DATABASE_CONN_MAX_AGE,
+        conn_health_checks=DATABASE_CONN_HEALTH_CHECKS,
+        ssl_require=not replica_url.startswith("sqlite"),
+    )
+
+    # A real replica shares the primary's test database. Two local SQLite
+    # files get separate test databases so routing can be asserted.
+    if not replica_url.startswith("sqlite"):
+        DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["portal.db_router.ReplicaRouter"]
+
+# Seconds a user's reads stay on the primary after they write
+DATABASE_REPLICA_PIN_SECONDS = int(os.environ.get("DATABASE_REPLICA_PIN_SECONDS", "10"))
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -93,6 +126,12 @@ STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_DIRS = [BASE_DIR / "portal" / "static"]
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# collectstatic writes content-hashed names plus .gz (and .br when the
+# Brotli package is installed) copies of each file; WhiteNoise serves the
+# pre-compressed copy the browser accepts and marks hashed names
+# "immutable" with a ten-year max-age. Bootstrap and the bootstrap-icons
+# subset are vendored under portal/static/vendor, so pages make no CDN
+# requests.
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
@@ -101,4 +140,39 @@ LOGIN_URL = "login"
 LOGIN_REDIRECT_URL = "portal:dashboard"
 LOGOUT_REDIRECT_URL = "portal:home"
 
-DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
\ No newline at end of file
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Shared by rate limits and cached analytics. LocMem is per-process;
+# point CACHE_BACKEND / CACHE_LOCATION at a shared cache in production.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+# Chunked, resumable uploads (portal.uploads). Partial files are kept
+# outside MEDIA_ROOT so they are never served.
+CHUNKED_UPLOAD_ROOT = Path(os.environ.get("CHUNKED_UPLOAD_ROOT", BASE_DIR / "uploads"))
+CHUNKED_UPLOAD_MAX_CHUNK = int(os.environ.get("CHUNKED_UPLOAD_MAX_CHUNK", 8 * 1024 * 1024))
+CHUNKED_UPLOAD_MAX_SIZE = int(os.environ.get("CHUNKED_UPLOAD_MAX_SIZE", 2 * 1024 * 1024 * 1024))
+
+# Bulk transcript verification API (portal.views.verify_transcripts_api)
+VERIFY_BATCH_MAX = int(os.environ.get("VERIFY_BATCH_MAX", "50"))
+VERIFY_RATE_LIMIT = int(os.environ.get("VERIFY_RATE_LIMIT", "30"))  # requests per minute per client
+
+# Per-request timings from portal.middleware.RequestTimingMiddleware
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "portal.timing": {
+            "handlers": ["console"],
+            "level": os.environ.get("REQUEST_TIMING_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
@@ -12,6 +12,9 @@ urlpatterns = [
     # Django Built-in Authentication (login, logout, password reset, etc.)
     path("accounts/", include("django.contrib.auth.urls")),
 
+    # Exams pages (read-only views over the portal data)
+    path("exams/", include("exams.urls")),
+
     # Portal Application
     path("", include("portal.urls")),
 ]
\ No newline at end of file
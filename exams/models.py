@@ -1,5 +1,8 @@
 from django.db import models
 
+# Legacy tables, kept only as the source for portal's migrate_exams_data.
+# The exams pages read the portal models.
+
 class Semester(models.Model):
     name = models.CharField(max_length=100)
     start_date = models.DateField()
@@ -25,40 +28,6 @@ class Student(models.Model):
     def __str__(self):
         return f"{self.name} ({self.registration_number})"
 
-    def calculate_gpa(self, semester):
-        results = Result.objects.filter(student=self, semester=semester)
-        total_points = 0
-        total_credits = 0
-        for r in results:
-            total_points += r.course.credit_hours * r.points
-            total_credits += r.course.credit_hours
-        if total_credits == 0:
-            return 0
-        return round(total_points / total_credits, 2)
-
-    def gpa_classification(self, gpa):
-        if gpa >= 3.5:
-            return "Distinction"
-        elif gpa >= 3.0:
-            return "Upper Credit"
-        elif gpa >= 2.5:
-            return "Lower Credit"
-        elif gpa >= 1.5:
-            return "Average"
-        elif gpa >= 1.0:
-            return "Pass"
-        else:
-            return "Fail"
-
-    def withdrawal_status(self, semester):
-        gpa = self.calculate_gpa(semester)
-        if gpa < 1.0:
-            return "Withdrawn"
-        failed_repeat = Result.objects.filter(student=self, semester=semester, score__lt=30).exists()
-        if failed_repeat:
-            return "Withdrawn"
-        return "Active"   
-
 
 class Result(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
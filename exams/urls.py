@@ -13,6 +13,6 @@ urlpatterns = [
     path("logout/", views.user_logout, name="logout"),
     path("add_result/", views.add_result, name="add_result"),
     path("student_results/", views.student_results, name="student_results"),
+    path("api/student_results/", views.student_results_api, name="student_results_api"),
     path("upload/", views.upload_file, name="upload"),
-    path("csrf_debug/", views.csrf_debug, name="csrf_debug"),
 ]
@@ -1,211 +1,197 @@
 from django.shortcuts import render, redirect
+from django.core.paginator import Paginator
+from django.http import JsonResponse
+from django.db.models import F, Q
 from django.contrib import messages
-from django.conf import settings
 from django.contrib.admin.views.decorators import staff_member_required
-from django.views.decorators.http import require_http_methods
-from django.views.decorators.csrf import csrf_protect, csrf_exempt
-from django.db import IntegrityError, transaction
-from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-import os
+from django.views.decorators.http import require_http_methods, require_POST
+from django.views.decorators.csrf import csrf_protect
+from django.contrib.auth import logout
 import traceback
-from datetime import datetime
-from django.middleware.csrf import get_token
 
-from .forms import StudentForm, ResultForm
-from .models import Student, Result, Semester, Course
+from portal.db_router import replica_view
+from portal.gpa import semester_results, semester_results_json
+from portal.filestore import store_upload
+from portal.models import Student, Semester, StaffFile
 
 
+# Exams data now lives in the portal tables (see migrate_exams_data).
+# These pages read it; registration, logins and results go to the portal.
+
 def home(request):
     semesters = Semester.objects.all()
     return render(request, "exams/home.html", {"semesters": semesters})
 
 
+DASHBOARD_PAGE_SIZE = 50
+
+
+@staff_member_required
+@replica_view
 def dashboard(request):
-    students = Student.objects.all().order_by("registration_number")
-    return render(request, "exams/dashboard.html", {"students": students})
+    """
+    Keyset pagination on the unique reg_number: ?after= / ?before= a
+    reg number, so every page is one indexed range scan of at most
+    DASHBOARD_PAGE_SIZE + 1 rows however deep it is.
+    """
+    query = request.GET.get("q", "").strip()
+    after = request.GET.get("after", "").strip()
+    before = request.GET.get("before", "").strip()
+
+    students = Student.objects.select_related("user").annotate(
+        latest_gpa=F("standing__latest_gpa"),
+        cumulative_gpa=F("standing__gpa"),
+    )
+
+    if query:
+        students = students.filter(
+            Q(reg_number__istartswith=query)
+            | Q(user__first_name__icontains=query)
+            | Q(user__last_name__icontains=query)
+        )
+
+    if before:
+        students = list(students.filter(reg_number__lt=before).order_by("-reg_number")[:DASHBOARD_PAGE_SIZE + 1])
+        has_previous = len(students) > DASHBOARD_PAGE_SIZE
+        students = students[:DASHBOARD_PAGE_SIZE][::-1]
+        has_next = True
+    else:
+        if after:
+            students = students.filter(reg_number__gt=after)
+        students = list(students.order_by("reg_number")[:DASHBOARD_PAGE_SIZE + 1])
+        has_next = len(students) > DASHBOARD_PAGE_SIZE
+        students = students[:DASHBOARD_PAGE_SIZE]
+        has_previous = bool(after)
+
+    return render(request, "exams/dashboard.html", {
+        "students": students,
+        "query": query,
+        "previous_before": students[0].reg_number if has_previous and students else None,
+        "next_after": students[-1].reg_number if has_next and students else None,
+    })
 
 
-@csrf_protect
-@require_http_methods(["GET", "POST"])
 def register_student(request):
-    student = None
-    if request.method == "POST":
-        form = StudentForm(request.POST)
-        if form.is_valid():
-            try:
-                with transaction.atomic():
-                    student = form.save(commit=True)
-                messages.success(request, "Student registered successfully. They can now log in with their registration number and password.")
-            except IntegrityError:
-                traceback.print_exc()
-                form.add_error(None, "Duplicate registration number or email.")
-                messages.error(request, "Registration failed due to duplicate data.")
-            except Exception as e:
-                traceback.print_exc()
-                form.add_error(None, f"Unexpected error: {e}")
-                messages.error(request, f"Registration failed: {e}")
-        else:
-            messages.error(request, "Please correct the errors below.")
-    else:
-        form = StudentForm()
-    return render(request, "exams/register_student.html", {"form": form, "student": student})
+    return redirect("portal:register")
 
 
-@csrf_protect
-@require_http_methods(["GET", "POST"])
 def student_login(request):
-    if request.method == "POST":
-        reg_no = request.POST.get("registration_number", "").strip()
-        password = request.POST.get("password", "").strip()
-        if not reg_no or not password:
-            messages.error(request, "Please enter both registration number and password.")
-            return render(request, "exams/student_login.html")
-        user = authenticate(request, username=reg_no, password=password)
-        if user is not None:
-            student = Student.objects.filter(registration_number=reg_no).first()
-            if not student:
-                messages.error(request, "No student profile found for this registration number.")
-                return render(request, "exams/student_login.html")
-            login(request, user)
-            messages.success(request, f"Welcome, {student.name}.")
-            return redirect("exams:dashboard")
-        else:
-            messages.error(request, "Invalid registration number or password.")
-    return render(request, "exams/student_login.html")
+    return redirect("login")
 
 
-@csrf_protect
-@require_http_methods(["GET", "POST"])
 def staff_login(request):
-    if request.method == "POST":
-        username = request.POST.get("username", "").strip()
-        password = request.POST.get("password", "").strip()
-        if not username or not password:
-            messages.error(request, "Please enter username and password.")
-            return render(request, "exams/staff_login.html")
-        user = authenticate(request, username=username, password=password)
-        if user is not None:
-            if user.is_active and user.is_staff:
-                login(request, user)
-                messages.success(request, f"Welcome, {user.username}.")
-                return redirect("exams:dashboard")
-            else:
-                messages.error(request, "You are not authorized as staff.")
-        else:
-            messages.error(request, "Invalid username or password.")
-    return render(request, "exams/staff_login.html")
+    return redirect("login")
 
 
+@require_POST
 def user_logout(request):
     logout(request)
     messages.info(request, "You have been logged out.")
     return redirect("exams:home")
 
 
-@staff_member_required
-@csrf_protect
-@require_http_methods(["GET", "POST"])
 def add_result(request):
-    if request.method == "POST":
-        form = ResultForm(request.POST)
-        if form.is_valid():
-            try:
-                result = form.save(commit=True)
-                messages.success(request, "Result saved.")
-                return redirect("exams:add_result")  # <-- FIXED
-            except Exception as e:
-                traceback.print_exc()
-                messages.error(request, f"Failed to save result: {e}")
-        else:
-            messages.error(request, "Please correct the errors below.")
-    else:
-        form = ResultForm()
-    return render(request, "exams/add_result.html", {"form": form})
+    return redirect("portal:add_result")
+
 
+def is_staff_user(user):
+    return user.is_staff or hasattr(user, "staff")
 
+
+@login_required
 def student_results(request):
-    reg_no = request.GET.get("registration_number", "").strip()
+    is_staff = is_staff_user(request.user)
+    if not (is_staff or hasattr(request.user, "student")):
+        messages.error(request, "Access denied.")
+        return redirect("exams:home")
+
+    # Students always see their own results, whatever the query says
+    if is_staff:
+        reg_no = request.GET.get("registration_number", "").strip()
+    else:
+        reg_no = request.user.student.reg_number
     semester_id = request.GET.get("semester", "").strip()
 
-    student = Student.objects.filter(registration_number=reg_no).first() if reg_no else None
-    semester = Semester.objects.filter(id=semester_id).first() if semester_id else None
+    found = semester_results(reg_no, int(semester_id)) if reg_no and semester_id.isdigit() else None
 
-    results = Result.objects.filter(student=student, semester=semester).select_related("course") if student and semester else []
-    gpa = student.calculate_gpa(semester) if student and semester else None
-    classification = student.gpa_classification(gpa) if gpa is not None else None
-    status = student.withdrawal_status(semester) if student and semester else None
+    if found is None:
+        # No results: look the student and semester up to say so
+        found = {
+            "student": Student.objects.select_related("user").filter(reg_number=reg_no).first() if reg_no else None,
+            "semester": Semester.objects.filter(id=semester_id).first() if semester_id.isdigit() else None,
+            "results": [],
+            "gpa": None,
+            "classification": None,
+            "status": None,
+        }
 
-    semesters = Semester.objects.all().order_by("-start_date")
+    semesters = Semester.objects.all()
     return render(request, "exams/student_results.html", {
-        "student": student,
-        "semester": semester,
-        "results": results,
-        "gpa": gpa,
-        "classification": classification,
-        "status": status,
+        **found,
         "semesters": semesters,
+        "is_staff": is_staff,
     })
 
 
+@require_http_methods(["GET"])
+def student_results_api(request):
+    """Staff may ask for any reg number; a student only for their own."""
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Login required."}, status=401)
+
+    is_staff = is_staff_user(request.user)
+    if not (is_staff or hasattr(request.user, "student")):
+        return JsonResponse({"error": "Only students and staff can view results."}, status=403)
+
+    reg_no = request.GET.get("registration_number", "").strip()
+    semester_id = request.GET.get("semester", "").strip()
+
+    if not is_staff:
+        own_reg_no = request.user.student.reg_number
+        if reg_no and reg_no != own_reg_no:
+            return JsonResponse({"error": "Students can only view their own results."}, status=403)
+        reg_no = own_reg_no
+
+    if not reg_no or not semester_id.isdigit():
+        return JsonResponse({"error": "registration_number and semester are required."}, status=400)
+
+    data = semester_results_json(reg_no, int(semester_id))
+    if data is None:
+        return JsonResponse({"error": "No results for this student and semester."}, status=404)
+
+    return JsonResponse(data)
+
+
+STAFF_FILES_PAGE_SIZE = 25
+
+
 @staff_member_required
 @csrf_protect
 @require_http_methods(["GET", "POST"])
 def upload_file(request):
-    uploaded_files = []
-    staff_dir = os.path.join(settings.MEDIA_ROOT, "staff")
-    os.makedirs(staff_dir, exist_ok=True)
-
     if request.method == "POST":
         file = request.FILES.get("file")
         if file:
             try:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                base_name, ext = os.path.splitext(file.name)
-                safe_name = f"{base_name}_{timestamp}{ext}"
-                save_path = os.path.join(staff_dir, safe_name)
-
-                with open(save_path, "wb+") as destination:
-                    for chunk in file.chunks():
-                        destination.write(chunk)
-
-                uploaded_files.append({
-                    "filename": safe_name,
-                    "url": os.path.join(settings.MEDIA_URL.lstrip("/"), "staff", safe_name),
-                    "timestamp": timestamp,
-                })
-
-                messages.success(request, f"Uploaded: {safe_name}")
-                return redirect("exams:upload")  # <-- FIXED
+                staff_file, stored = store_upload(file, uploaded_by=request.user)
+                if stored:
+                    messages.success(request, f"Uploaded: {staff_file.file_name}")
+                else:
+                    messages.success(
+                        request,
+                        f"Uploaded: {staff_file.file_name} (same content as an earlier upload; stored once)"
+                    )
+                return redirect("exams:upload")
             except Exception as e:
                 traceback.print_exc()
                 messages.error(request, f"Upload failed: {e}")
         else:
             messages.error(request, "No file selected.")
 
-    files = []
-    if os.path.exists(staff_dir):
-        for fname in sorted(os.listdir(staff_dir), reverse=True):
-            name, ext = os.path.splitext(fname)
-            files.append({
-                "filename": fname,
-                "url": os.path.join(settings.MEDIA_URL.lstrip("/"), "staff", fname),
-                "timestamp": "",
-            })
-
-    return render(request, "exams/upload.html", {"files": files, "uploaded_files": uploaded_files})
+    files = Paginator(
+        StaffFile.objects.select_related("uploaded_by"), STAFF_FILES_PAGE_SIZE
+    ).get_page(request.GET.get("page"))
 
+    return render(request, "exams/upload.html", {"files": files})
 
-@csrf_exempt
-@require_http_methods(["GET", "POST"])
-def csrf_debug(request):
-    expected = get_token(request)
-    submitted_form_token = request.POST.get("csrfmiddlewaretoken", "")
-    submitted_header_token = request.META.get("HTTP_X_CSRFTOKEN", "")
-    context = {
-        "expected_token": expected,
-        "submitted_form_token": submitted_form_token,
-        "submitted_header_token": submitted_header_token,
-        "method": request.method,
-    }
-    return render(request, "exams/csrf_debug.html", context)
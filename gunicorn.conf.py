@@ -0,0 +1,83 @@
+"""
+gunicorn.conf.py
+Gunicorn settings for Render + local production runs.
+Every value can be overridden from the environment.
+"""
+
+import os
+
+
+def cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# =====================================================
+# WORKER MODEL
+# =====================================================
+# Uvicorn workers serve the ASGI app (async dashboards and transcripts).
+# Sync/gthread workers fall back to the WSGI app.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "uvicorn_worker.UvicornWorker")
+
+if "uvicorn" in worker_class.lower():
+    wsgi_app = "college_site_new.asgi:application"
+    default_workers = cpu_count() + 1
+else:
+    wsgi_app = "college_site_new.wsgi:application"
+    default_workers = cpu_count() * 2 + 1
+
+workers = int(os.environ.get("WEB_CONCURRENCY", default_workers))
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# =====================================================
+# PRELOAD
+# Load Django, settings, models and URLconf once in the master
+# so workers share those pages copy-on-write. ReportLab and
+# openpyxl stay lazy (imported on first PDF/Excel request), so
+# they are loaded per worker, only in workers that need them.
+# =====================================================
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True") == "True"
+
+# =====================================================
+# TIMEOUTS & RECYCLING
+# =====================================================
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+
+# Restart workers periodically to reclaim memory; jitter avoids
+# every worker restarting at the same moment.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+# Heartbeat files on tmpfs so a slow disk never looks like a hung worker
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+# =====================================================
+# LOGGING
+# %(M)s is the request duration in milliseconds (sync/gthread workers).
+# portal.middleware.RequestTimingMiddleware logs view timings for every
+# worker class, including uvicorn which ignores access_log_format.
+# =====================================================
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+access_log_format = '%(h)s "%(r)s" %(s)s %(b)s %(M)sms'
+
+
+# =====================================================
+# SERVER HOOKS
+# =====================================================
+def post_fork(server, worker):
+    # Never share database sockets opened during preload with workers
+    if not server.cfg.preload_app:
+        return
+
+    from django.db import connections
+
+    connections.close_all()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Student, Staff, Course, Semester, Result
+from .models import Student, Staff, Course, Semester, Result, ResultChange, StaffFile
 
 
 # =====================================================
@@ -125,4 +125,90 @@ class ResultAdmin(admin.ModelAdmin):
         "grade_point",
         "grade_letter",
         "status",
-    )
\ No newline at end of file
+    )
+
+    def save_model(self, request, obj, form, change):
+        # Marks the same student/course/semester had before this save
+        key_changed = change and {"student", "course", "semester"} & set(form.changed_data)
+        old_marks = form.initial.get("marks") if change and not key_changed else None
+
+        super().save_model(request, obj, form, change)
+
+        if not change or key_changed or "marks" in form.changed_data:
+            ResultChange.objects.create(
+                student=obj.student,
+                course=obj.course,
+                semester=obj.semester,
+                old_marks=old_marks,
+                new_marks=obj.marks,
+                source=ResultChange.ADMIN,
+                changed_by=request.user,
+            )
+
+
+# =====================================================
+# RESULT MARKS AUDIT LOG (READ-ONLY)
+# =====================================================
+@admin.register(ResultChange)
+class ResultChangeAdmin(admin.ModelAdmin):
+
+    list_display = (
+        "changed_at",
+        "student",
+        "course",
+        "semester",
+        "old_marks",
+        "new_marks",
+        "source",
+        "changed_by",
+    )
+
+    list_select_related = ("student", "course", "semester", "changed_by")
+
+    search_fields = (
+        "=student__reg_number",
+    )
+
+    list_filter = (
+        "source",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+# =====================================================
+# STAFF FILE STORE
+# =====================================================
+@admin.register(StaffFile)
+class StaffFileAdmin(admin.ModelAdmin):
+
+    list_display = (
+        "file_name",
+        "size",
+        "content_type",
+        "uploaded_by",
+        "created_at",
+    )
+
+    list_select_related = ("uploaded_by",)
+
+    search_fields = (
+        "file_name",
+        "=sha256",
+    )
+
+    readonly_fields = (
+        "path",
+        "sha256",
+        "size",
+        "content_type",
+        "uploaded_by",
+        "created_at",
+    )
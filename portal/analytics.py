@@ -0,0 +1,340 @@
+"""
+portal/analytics.py
+Course Analytics (per course & semester)
+
+Counts, mean, standard deviation, pass/repeat rates and the grade
+histogram come from one grouped aggregate query. Percentiles use
+PostgreSQL's percentile_cont in the same query; other databases fall
+back to NumPy over a single values_list fetch.
+
+Statistics are cached per course until one of its results, or the
+course or a semester it ran in, changes; when they were read from a
+(possibly lagging) replica, only briefly.
+
+Trends across semesters and cohort comparisons read the ResultRollup
+fact table (counts, sums, sums of squares, grade counts) instead of
+aggregating raw results.
+"""
+
+import math
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Aggregate, Avg, Count, F, FloatField, Q, StdDev, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .db_router import REPLICA_DB
+from .models import Course, Semester, Result, ResultRollup
+
+
+CACHE_TIMEOUT = 24 * 60 * 60
+# The replica may not have the change that just invalidated the cache yet
+REPLICA_CACHE_TIMEOUT = 60
+PERCENTILES = (25, 50, 75, 90)
+
+# Mirrors Result.grade_letter: (letter, lowest mark)
+GRADE_BANDS = [
+    ("A", 80),
+    ("B+", 70),
+    ("B", 65),
+    ("C", 50),
+    ("D", 40),
+    ("E1", 30),
+    ("E2", 0),
+]
+
+PASS_MARK = 40      # Result.status: PASS
+REPEAT_MARK = 30    # Result.status: REPEAT COURSE below PASS_MARK, UNSUPPLEMENTABLE FAIL below this
+
+
+class PercentileCont(Aggregate):
+    """PostgreSQL: percentile_cont(fraction) WITHIN GROUP (ORDER BY expression)"""
+
+    function = "percentile_cont"
+    template = "%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+def grade_band_filters():
+    filters = {}
+    upper = None
+    for letter, lower in GRADE_BANDS:
+        band = Q(marks__gte=lower)
+        if upper is not None:
+            band &= Q(marks__lt=upper)
+        filters[letter] = band
+        upper = lower
+    return filters
+
+
+# =====================================================
+# CACHE
+# =====================================================
+def cache_key(course_id):
+    return f"portal:analytics:course:{course_id or 'all'}"
+
+
+def invalidate_course_stats(course_ids):
+    """Call whenever results of these courses are written or deleted."""
+    cache.delete_many([cache_key(None)] + [cache_key(course_id) for course_id in set(course_ids)])
+
+
+# Bulk writes skip these signals; importers invalidate explicitly
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def result_changed(sender, instance, **kwargs):
+    course_id = instance.course_id
+    transaction.on_commit(lambda: invalidate_course_stats([course_id]))
+
+
+# Cached rows carry course and semester names
+@receiver(post_save, sender=Course)
+def course_changed(sender, instance, created, **kwargs):
+    if not created:
+        course_id = instance.id
+        transaction.on_commit(lambda: invalidate_course_stats([course_id]))
+
+
+@receiver(post_save, sender=Semester)
+def semester_changed(sender, instance, created, **kwargs):
+    if not created:
+        course_ids = set(
+            Result.objects.filter(semester_id=instance.id).values_list("course_id", flat=True).order_by()
+        )
+        transaction.on_commit(lambda: invalidate_course_stats(course_ids))
+
+
+# =====================================================
+# STATISTICS
+# =====================================================
+def course_stats(course_id=None):
+    """Statistics per (course, semester), for one course or all of them."""
+    key = cache_key(course_id)
+    stats = cache.get(key)
+    if stats is None:
+        from_replica = Result.objects.db == REPLICA_DB
+        stats = compute_course_stats(course_id)
+        cache.set(key, stats, REPLICA_CACHE_TIMEOUT if from_replica else CACHE_TIMEOUT)
+    return stats
+
+
+def compute_course_stats(course_id=None):
+    results = Result.objects.filter(marks__isnull=False)
+    if course_id is not None:
+        results = results.filter(course_id=course_id)
+
+    # Pin the alias so both queries (and the vendor check) hit the same database
+    results = results.using(results.db)
+    use_sql_percentiles = connections[results.db].vendor == "postgresql"
+
+    histogram = {
+        f"grade_{index}": Count("id", filter=band)
+        for index, band in enumerate(grade_band_filters().values())
+    }
+    percentiles = {
+        f"p{percentile}": PercentileCont("marks", percentile / 100)
+        for percentile in PERCENTILES
+    } if use_sql_percentiles else {}
+
+    groups = results.values("course_id", "semester_id").annotate(
+        count=Count("id"),
+        mean=Avg("marks"),
+        stddev=StdDev("marks"),
+        passed=Count("id", filter=Q(marks__gte=PASS_MARK)),
+        repeat=Count("id", filter=Q(marks__gte=REPEAT_MARK, marks__lt=PASS_MARK)),
+        **histogram,
+        **percentiles,
+    ).order_by()
+
+    groups = list(groups)
+
+    if groups and not use_sql_percentiles:
+        fallback = numpy_percentiles(results)
+        for group in groups:
+            group.update(fallback[(group["course_id"], group["semester_id"])])
+
+    courses = Course.objects.using(results.db).in_bulk({g["course_id"] for g in groups})
+    semesters = Semester.objects.using(results.db).in_bulk({g["semester_id"] for g in groups})
+
+    stats = []
+    for group in groups:
+        course = courses[group["course_id"]]
+        semester = semesters[group["semester_id"]]
+        count = group["count"]
+        stats.append({
+            "course_id": course.id,
+            "course_code": course.code,
+            "course_name": course.name,
+            "semester_id": semester.id,
+            "semester": str(semester),
+            "count": count,
+            "mean": round(group["mean"], 2),
+            "stddev": round(group["stddev"] or 0, 2),
+            "percentiles": {
+                f"p{percentile}": round(group[f"p{percentile}"], 2)
+                for percentile in PERCENTILES
+            },
+            "median": round(group["p50"], 2),
+            "histogram": {
+                letter: group[f"grade_{index}"]
+                for index, (letter, _) in enumerate(GRADE_BANDS)
+            },
+            "pass_rate": round(100 * group["passed"] / count, 1),
+            "repeat_rate": round(100 * group["repeat"] / count, 1),
+        })
+
+    # Newest semester first, then course code
+    stats.sort(key=lambda s: s["course_code"])
+    stats.sort(key=lambda s: (semesters[s["semester_id"]].year, semesters[s["semester_id"]].name), reverse=True)
+    return stats
+
+
+def numpy_percentiles(results):
+    # Imported on first use so workers do not pay for NumPy at startup
+    import numpy as np
+
+    marks = defaultdict(list)
+    for course_id, semester_id, mark in results.values_list(
+        "course_id", "semester_id", "marks"
+    ).order_by().iterator(chunk_size=5000):
+        marks[(course_id, semester_id)].append(mark)
+
+    fallback = {}
+    for key, values in marks.items():
+        points = np.percentile(np.asarray(values, dtype=float), PERCENTILES)
+        fallback[key] = {
+            f"p{percentile}": float(point)
+            for percentile, point in zip(PERCENTILES, points)
+        }
+    return fallback
+
+
+# =====================================================
+# ROLLUP (FACT TABLE)
+# =====================================================
+def rollup_results(semester_id=None):
+    """
+    Rebuild ResultRollup from one grouped query over results, for every
+    semester or just one. Returns the number of rollup rows written.
+    """
+    results = Result.objects.filter(marks__isnull=False)
+    if semester_id is not None:
+        results = results.filter(semester_id=semester_id)
+
+    histogram = {
+        f"grade_{index}": Count("id", filter=band)
+        for index, band in enumerate(grade_band_filters().values())
+    }
+
+    groups = results.values(
+        "student__program", "student__year", "semester_id", "course_id"
+    ).annotate(
+        count=Count("id"),
+        marks_sum=Sum("marks"),
+        marks_sum_squares=Sum(F("marks") * F("marks")),
+        passed=Count("id", filter=Q(marks__gte=PASS_MARK)),
+        repeat=Count("id", filter=Q(marks__gte=REPEAT_MARK, marks__lt=PASS_MARK)),
+        **histogram,
+    ).order_by()
+
+    rows = [
+        ResultRollup(
+            program=group["student__program"],
+            year=group["student__year"],
+            semester_id=group["semester_id"],
+            course_id=group["course_id"],
+            count=group["count"],
+            marks_sum=group["marks_sum"],
+            marks_sum_squares=group["marks_sum_squares"],
+            passed=group["passed"],
+            repeat=group["repeat"],
+            grade_counts=[group[f"grade_{index}"] for index in range(len(GRADE_BANDS))],
+        )
+        for group in groups.iterator(chunk_size=5000)
+    ]
+
+    stale = ResultRollup.objects.all()
+    if semester_id is not None:
+        stale = stale.filter(semester_id=semester_id)
+
+    with transaction.atomic():
+        stale.delete()
+        ResultRollup.objects.bulk_create(rows, batch_size=1000)
+
+    return len(rows)
+
+
+def summarise(rollups):
+    """Combine rollup rows (or their sums) into mean, stddev and rates."""
+    count = sum(r["count"] for r in rollups)
+    if not count:
+        return None
+
+    marks_sum = sum(r["marks_sum"] for r in rollups)
+    marks_sum_squares = sum(r["marks_sum_squares"] for r in rollups)
+    mean = marks_sum / count
+    variance = max(marks_sum_squares / count - mean * mean, 0)
+
+    grade_counts = [0] * len(GRADE_BANDS)
+    for r in rollups:
+        for index, total in enumerate(r["grade_counts"]):
+            grade_counts[index] += total
+
+    return {
+        "count": count,
+        "mean": round(mean, 2),
+        "stddev": round(math.sqrt(variance), 2),
+        "pass_rate": round(100 * sum(r["passed"] for r in rollups) / count, 1),
+        "repeat_rate": round(100 * sum(r["repeat"] for r in rollups) / count, 1),
+        "histogram": dict(zip((letter for letter, _ in GRADE_BANDS), grade_counts)),
+    }
+
+
+ROLLUP_FIELDS = ("count", "marks_sum", "marks_sum_squares", "passed", "repeat", "grade_counts")
+
+
+def filter_rollups(program=None, year=None, course=None):
+    rollups = ResultRollup.objects.all()
+    if program:
+        rollups = rollups.filter(program__iexact=program)
+    if year:
+        rollups = rollups.filter(year=year)
+    if course:
+        rollups = rollups.filter(course__code__iexact=course)
+    return rollups
+
+
+def semester_trend(program=None, year=None, course=None):
+    """One summary per semester, oldest first."""
+    grouped = defaultdict(list)
+    rollups = filter_rollups(program, year, course).values(
+        "semester__name", "semester__year", *ROLLUP_FIELDS
+    )
+    for r in rollups:
+        grouped[(r["semester__year"], r["semester__name"])].append(r)
+
+    return [
+        {"semester": f"{name} ({semester_year})", **summarise(grouped[(semester_year, name)])}
+        for semester_year, name in sorted(grouped)
+    ]
+
+
+def cohort_comparison(semester_id=None, course=None):
+    """One summary per (program, year of study), for one semester or all of them."""
+    rollups = filter_rollups(course=course)
+    if semester_id:
+        rollups = rollups.filter(semester_id=semester_id)
+
+    grouped = defaultdict(list)
+    for r in rollups.values("program", "year", *ROLLUP_FIELDS):
+        grouped[(r["program"], r["year"])].append(r)
+
+    return [
+        {"program": program, "year": year, **summarise(grouped[(program, year)])}
+        for program, year in sorted(grouped)
+    ]
@@ -10,3 +10,7 @@ class PortalConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "portal"
     verbose_name = "Forestry & Wildlife Portal"
+
+    def ready(self):
+        # Signal receivers that keep cached analytics, results and standings fresh
+        from . import analytics, gpa, standing  # noqa: F401
@@ -0,0 +1,90 @@
+"""
+portal/csvstream.py
+Streaming CSV Reader
+
+Uploaded bytes are decoded chunk by chunk with an incremental UTF-8
+decoder (io.TextIOWrapper over the chunks) and fed to csv.reader one
+row at a time, so memory holds one chunk and one row however large
+the file is.
+
+Excel handling: the UTF-8 byte order mark ("CSV UTF-8") is dropped,
+a "sep=;" first line selects the delimiter, old Mac "\r" line endings
+are accepted, and header names are matched case-insensitively.
+"""
+
+import csv
+import io
+
+
+READ_SIZE = 64 * 1024
+
+
+def file_chunks(file, size=READ_SIZE):
+    """Chunks of an open binary file."""
+    return iter(lambda: file.read(size), b"")
+
+
+class ChunkStream(io.RawIOBase):
+    """A readable binary stream over an iterator of byte chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.pending = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending:
+            self.pending = next(self.chunks, None)
+            if self.pending is None:
+                self.pending = b""
+                return 0
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+def decode_lines(chunks, encoding="utf-8-sig"):
+    """
+    Text lines, with their line endings, from chunks of bytes.
+    TextIOWrapper decodes incrementally; newline="" keeps "\r\n" and
+    "\r" intact for csv.reader, even across chunk boundaries.
+    """
+    stream = io.BufferedReader(ChunkStream(chunks), READ_SIZE)
+    return io.TextIOWrapper(stream, encoding=encoding, newline="")
+
+
+def read_csv(chunks):
+    """
+    Dict rows keyed by the lower-cased header, like csv.DictReader:
+    blank lines are skipped and missing trailing fields are None.
+    """
+    lines = decode_lines(chunks)
+
+    first = next(lines, "")
+    delimiter = ","
+    hint = first.strip()
+    if hint.lower().startswith("sep=") and len(hint) == 5:
+        delimiter = hint[4]
+        first = next(lines, "")
+
+    def all_lines():
+        yield first
+        yield from lines
+
+    reader = csv.reader(all_lines(), delimiter=delimiter)
+
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [name.strip().lower() for name in header]
+
+    for values in reader:
+        if not values:
+            continue
+        row = dict(zip(header, values))
+        for name in header[len(values):]:
+            row[name] = None
+        yield row
@@ -0,0 +1,145 @@
+"""
+portal/db_router.py
+Read-Replica Routing for Dashboards, Transcripts and Reports
+"""
+
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+
+REPLICA_DB = "replica"
+PIN_COOKIE = "pin_primary"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+# Set while a read-only view or reporting command is running
+_use_replica = ContextVar("use_replica", default=False)
+
+# Set while the current user has written recently
+_pinned_to_primary = ContextVar("pinned_to_primary", default=False)
+
+
+def replica_configured():
+    return REPLICA_DB in settings.DATABASES
+
+
+# =====================================================
+# READ-ONLY SCOPE
+# =====================================================
+
+@contextmanager
+def read_replica():
+    """
+    Send ORM reads inside this block to the replica (if configured).
+    Writes always go to the primary.
+    """
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def replica_view(view):
+    """
+    Decorator for read-only views (sync or async).
+    """
+
+    if iscoroutinefunction(view):
+
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            with read_replica():
+                return await view(request, *args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with read_replica():
+            return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+# =====================================================
+# ROUTER
+# =====================================================
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if (
+            _use_replica.get()
+            and not _pinned_to_primary.get()
+            and replica_configured()
+        ):
+            return REPLICA_DB
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Instances loaded from the replica must still be saved on the primary
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {"default", REPLICA_DB}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+# =====================================================
+# STICKY PRIMARY AFTER WRITES
+# =====================================================
+
+class ReplicaPinningMiddleware:
+    """
+    After a user writes (any unsafe request), keep their reads on the
+    primary for DATABASE_REPLICA_PIN_SECONDS so they see their own edits
+    before replication catches up.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = _pinned_to_primary.set(PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned_to_primary.reset(token)
+
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        token = _pinned_to_primary.set(PIN_COOKIE in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _pinned_to_primary.reset(token)
+
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and replica_configured():
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+
+        return response
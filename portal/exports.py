@@ -0,0 +1,278 @@
+"""
+portal/exports.py
+Streaming Result Exports (CSV / XLSX)
+
+Rows are read with .iterator()/.aiterator() and written in
+batches, so memory stays flat no matter how many results match.
+"""
+
+import csv
+import os
+import tempfile
+from io import StringIO
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import FilteredRelation, Q
+from django.http import StreamingHttpResponse
+
+from .models import Student, Result
+
+
+CHUNK_SIZE = 2000      # rows fetched per database round trip
+BATCH_ROWS = 1000      # CSV rows per streamed chunk
+FILE_CHUNK = 64 * 1024
+
+HEADER = [
+    "reg_number",
+    "student_name",
+    "program",
+    "year",
+    "course_code",
+    "course_name",
+    "credit_hours",
+    "semester",
+    "semester_year",
+    "marks",
+    "grade",
+    "points",
+    "status",
+]
+
+TEMPLATE_HEADER = [
+    "reg_number",
+    "student_name",
+    "course_code",
+    "semester_id",
+    "semester",
+    "semester_year",
+    "marks",
+]
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+# =====================================================
+# QUERY
+# =====================================================
+
+def filter_results(semester=None, course=None, program=None, year=None):
+    """
+    semester: Semester id, course: Course code,
+    program / year: the student's programme and year of study.
+    """
+    results = Result.objects.select_related(
+        "student__user", "course", "semester"
+    ).order_by("semester__year", "semester__name", "course__code", "student__reg_number")
+
+    if semester:
+        results = results.filter(semester_id=semester)
+    if course:
+        results = results.filter(course__code__iexact=course)
+    if program:
+        results = results.filter(student__program__iexact=program)
+    if year:
+        results = results.filter(student__year=year)
+
+    # Resolve the database now: the rows are read after the view returns,
+    # outside any read_replica() block.
+    return results.using(results.db)
+
+
+def result_row(result):
+    student = result.student
+    return [
+        student.reg_number,
+        student.user.get_full_name(),
+        student.program,
+        student.year,
+        result.course.code,
+        result.course.name,
+        result.course.credit_hours,
+        result.semester.name,
+        result.semester.year,
+        result.marks,
+        result.grade_letter,
+        result.grade_point,
+        result.status,
+    ]
+
+
+def result_rows(results):
+    for result in results.iterator(chunk_size=CHUNK_SIZE):
+        yield result_row(result)
+
+
+async def aresult_rows(results):
+    async for result in results.aiterator(chunk_size=CHUNK_SIZE):
+        yield result_row(result)
+
+
+# =====================================================
+# RESULTS TEMPLATE (PRE-FILLED ROSTER)
+# =====================================================
+
+def template_roster(course, semester, program, year):
+    """
+    Every student expected to sit `course` in `semester`, with any
+    marks already recorded, in a single query.
+
+    Expected students are those in the given program and year of study;
+    students who already have a result are always included.
+    """
+    students = Student.objects.annotate(
+        current=FilteredRelation(
+            "results",
+            condition=Q(results__course=course, results__semester=semester),
+        )
+    )
+
+    expected = Q(program__iexact=program, year=year)
+
+    # .values(), not .values_list(): on Django 5.0 the latter runs its query
+    # as soon as aiterator() starts, which is still on the event loop
+    roster = students.filter(expected | Q(current__isnull=False)).values(
+        "reg_number", "user__first_name", "user__last_name", "current__marks"
+    ).order_by("reg_number")
+
+    return roster.using(roster.db)
+
+
+def template_row(entry, course, semester):
+    marks = entry["current__marks"]
+    return [
+        entry["reg_number"],
+        f"{entry['user__first_name']} {entry['user__last_name']}".strip(),
+        course.code,
+        semester.id,
+        semester.name,
+        semester.year,
+        "" if marks is None else marks,
+    ]
+
+
+def template_rows(roster, course, semester):
+    for entry in roster.iterator(chunk_size=CHUNK_SIZE):
+        yield template_row(entry, course, semester)
+
+
+async def atemplate_rows(roster, course, semester):
+    async for entry in roster.aiterator(chunk_size=CHUNK_SIZE):
+        yield template_row(entry, course, semester)
+
+
+# =====================================================
+# CSV
+# =====================================================
+
+def csv_chunks(header, rows):
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % BATCH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+async def acsv_chunks(header, rows):
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+
+    count = 0
+    async for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % BATCH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+# =====================================================
+# XLSX (openpyxl write-only mode)
+# =====================================================
+
+def write_xlsx(header, rows, path, title="Results"):
+    # Imported on first use so workers do not pay for openpyxl at startup
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title)
+    sheet.append(header)
+
+    for row in rows:
+        sheet.append(row)
+
+    workbook.save(path)
+
+
+def xlsx_tempfile(header, rows, title="Results"):
+    handle, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(handle)
+    try:
+        write_xlsx(header, rows, path, title)
+    except Exception:
+        os.unlink(path)
+        raise
+    return path
+
+
+def file_chunks(path):
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(FILE_CHUNK):
+                yield chunk
+    finally:
+        os.unlink(path)
+
+
+async def afile_chunks(path):
+    read = sync_to_async(lambda f: f.read(FILE_CHUNK), thread_sensitive=False)
+    try:
+        with open(path, "rb") as f:
+            while chunk := await read(f):
+                yield chunk
+    finally:
+        os.unlink(path)
+
+
+# =====================================================
+# RESPONSE
+# =====================================================
+
+def streaming_export(request, header, rows, arows, file_format, filename):
+    """
+    Stream rows as CSV or XLSX. `rows` / `arows` are the same rows as a
+    sync and an async generator; only the one matching the handler is
+    consumed. Under ASGI the body must be an async iterator, otherwise
+    Django buffers the whole body in memory.
+    """
+    is_async = isinstance(request, ASGIRequest)
+
+    if file_format == "xlsx":
+        path = xlsx_tempfile(header, rows)
+        content = afile_chunks(path) if is_async else file_chunks(path)
+    else:
+        content = acsv_chunks(header, arows) if is_async else csv_chunks(header, rows)
+
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[file_format])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{file_format}"'
+    return response
+
+
+def export_response(request, results, file_format, filename):
+    return streaming_export(
+        request, HEADER, result_rows(results), aresult_rows(results), file_format, filename
+    )
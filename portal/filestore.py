@@ -0,0 +1,108 @@
+"""
+portal/filestore.py
+Staff File Store
+
+Uploads are streamed to a temporary file in fixed-size chunks while
+their SHA-256 is computed, so memory stays bounded whatever the file
+size. Each distinct content is stored once, under its hash; every
+upload gets its own StaffFile row (uploader, file name) pointing at
+that copy. Listings are indexed queries on that table, never
+directory scans.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+
+from django.conf import settings
+
+from .models import StaffFile
+
+
+CHUNK_SIZE = 64 * 1024
+STORE_DIR = "staff"
+
+
+def store_root():
+    return os.path.join(settings.MEDIA_ROOT, STORE_DIR)
+
+
+def guess_content_type(file_name):
+    # Browsers' multipart content types are client-supplied; go by extension
+    return mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+
+
+def _extension(file_name):
+    extension = os.path.splitext(file_name)[1].lower()
+    return extension if re.fullmatch(r"\.[a-z0-9]{1,10}", extension) else ""
+
+
+def temporary_file():
+    """An open (fd, path) pair inside the store, so moving it in is a rename."""
+    os.makedirs(store_root(), exist_ok=True)
+    return tempfile.mkstemp(dir=store_root(), prefix=".upload-")
+
+
+def store_upload(uploaded_file, uploaded_by=None):
+    """
+    Stream an UploadedFile into the store.
+    Returns (StaffFile, stored); stored is False when the content was
+    already in the store and the new row shares it.
+    """
+    fd, temp_path = temporary_file()
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with os.fdopen(fd, "wb") as destination:
+            for chunk in uploaded_file.chunks(CHUNK_SIZE):
+                digest.update(chunk)
+                destination.write(chunk)
+                size += len(chunk)
+
+        return store_path(temp_path, uploaded_file.name, size, digest.hexdigest(), uploaded_by)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def store_path(temp_path, file_name, size, sha256, uploaded_by=None):
+    """
+    Move an already written and hashed file into the store and record
+    the upload. Returns (StaffFile, stored) like store_upload. The
+    caller removes temp_path if it is still there (known content is
+    not moved).
+    """
+    # The first upload's path is reused, so a later name's extension does not fork the copy
+    existing = StaffFile.objects.filter(sha256=sha256).values_list("path", flat=True).first()
+    relative_path = existing or f"{STORE_DIR}/{sha256[:2]}/{sha256}{_extension(file_name)}"
+    full_path = os.path.join(settings.MEDIA_ROOT, relative_path)
+
+    stored = not os.path.exists(full_path)
+    if stored:
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        # A rename inside the store; a streamed copy from another filesystem.
+        # Concurrent uploads of the same content replace it with identical bytes.
+        shutil.move(temp_path, full_path)
+
+    return StaffFile.objects.create(
+        uploaded_by=uploaded_by,
+        file_name=os.path.basename(file_name)[:255],
+        path=relative_path,
+        sha256=sha256,
+        size=size,
+        content_type=guess_content_type(file_name),
+    ), stored
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
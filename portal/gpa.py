@@ -0,0 +1,200 @@
+"""
+portal/gpa.py
+GPA Calculation (shared by the portal and the exams pages)
+
+semester_results() returns one student's semester results with GPA,
+classification and withdrawal status from a single query: window
+aggregates over the same rows carry the credit-weighted grade points
+and the lowest mark on every result. Its JSON form is cached per
+semester until one of that semester's results changes.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Min, Sum, Value, When, Window
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Result
+
+
+CACHE_TIMEOUT = 60 * 60
+UNSUPPLEMENTABLE_MARK = 30   # Result.status: UNSUPPLEMENTABLE FAIL below this
+
+# Mirrors Result.grade_point; NULL while marks are pending
+GRADE_POINT = Case(
+    When(marks__gte=80, then=Value(4.0)),
+    When(marks__gte=70, then=Value(3.5)),
+    When(marks__gte=65, then=Value(3.0)),
+    When(marks__gte=50, then=Value(2.0)),
+    When(marks__gte=40, then=Value(1.0)),
+    When(marks__isnull=False, then=Value(0.0)),
+    output_field=FloatField(),
+)
+
+GRADED_CREDITS = Case(
+    When(marks__isnull=False, then=F("course__credit_hours")),
+    output_field=FloatField(),
+)
+
+
+def calculate_gpa(results):
+    total_points = 0
+    total_credits = 0
+
+    for result in results:
+        if result.marks is None:
+            continue
+        total_points += result.grade_point * result.course.credit_hours
+        total_credits += result.course.credit_hours
+
+    if total_credits == 0:
+        return 0.0
+
+    return round(total_points / total_credits, 2)
+
+
+def classify_gpa(gpa):
+    if gpa < 1.0:
+        return "Withdraw"
+    elif gpa >= 3.5:
+        return "Distinction"
+    elif gpa >= 3.0:
+        return "Upper Credit"
+    elif gpa >= 2.5:
+        return "Lower Credit"
+    elif gpa >= 1.5:
+        return "Average"
+    return "Pass"
+
+
+def classify_semester_gpa(gpa):
+    """
+    The exams pages' scale: below 1.0 is "Fail" (withdrawal is reported
+    separately), unlike classify_gpa's "Withdraw".
+    """
+    if gpa >= 3.5:
+        return "Distinction"
+    elif gpa >= 3.0:
+        return "Upper Credit"
+    elif gpa >= 2.5:
+        return "Lower Credit"
+    elif gpa >= 1.5:
+        return "Average"
+    elif gpa >= 1.0:
+        return "Pass"
+    return "Fail"
+
+
+def withdrawal_status(gpa, lowest_marks):
+    """Withdrawn below 1.0 GPA or with any unsupplementable fail."""
+    if gpa < 1.0:
+        return "Withdrawn"
+    if lowest_marks is not None and lowest_marks < UNSUPPLEMENTABLE_MARK:
+        return "Withdrawn"
+    return "Active"
+
+
+# =====================================================
+# ONE STUDENT'S SEMESTER (SINGLE QUERY)
+# =====================================================
+def semester_results(reg_number, semester_id):
+    """
+    The student's results for the semester with GPA, classification and
+    withdrawal status, or None if they have no results in it.
+    """
+    over_semester = {"partition_by": [F("student_id"), F("semester_id")]}
+
+    results = list(
+        Result.objects.filter(student__reg_number=reg_number, semester_id=semester_id)
+        .select_related("student__user", "semester", "course")
+        .annotate(
+            points_total=Window(Sum(GRADE_POINT * F("course__credit_hours")), **over_semester),
+            credits_total=Window(Sum(GRADED_CREDITS), **over_semester),
+            lowest_marks=Window(Min("marks"), **over_semester),
+        )
+        .order_by("course__code")
+    )
+    if not results:
+        return None
+
+    first = results[0]
+    gpa = round(first.points_total / first.credits_total, 2) if first.credits_total else 0.0
+
+    return {
+        "student": first.student,
+        "semester": first.semester,
+        "results": results,
+        "gpa": gpa,
+        "classification": classify_semester_gpa(gpa),
+        "status": withdrawal_status(gpa, first.lowest_marks),
+    }
+
+
+# =====================================================
+# CACHED JSON
+# Keys carry a per-semester version; invalidating a semester bumps it.
+# =====================================================
+def _version_key(semester_id):
+    return f"portal:semester-results:version:{semester_id}"
+
+
+def _semester_version(semester_id):
+    key = _version_key(semester_id)
+    # Start from the clock so an evicted version never reuses old keys
+    cache.add(key, time.time_ns(), None)
+    return cache.get(key)
+
+
+def invalidate_semester_results(semester_ids):
+    """Call whenever results of these semesters are written or deleted."""
+    for semester_id in set(semester_ids):
+        try:
+            cache.incr(_version_key(semester_id))
+        except ValueError:
+            pass  # nothing cached for this semester
+
+
+def semester_results_json(reg_number, semester_id):
+    key = f"portal:semester-results:{semester_id}:{_semester_version(semester_id)}:{reg_number}"
+    data = cache.get(key)
+    if data is None:
+        data = serialize_semester_results(semester_results(reg_number, semester_id))
+        cache.set(key, data, CACHE_TIMEOUT)
+    return data
+
+
+def serialize_semester_results(found):
+    if found is None:
+        return None
+
+    student = found["student"]
+    semester = found["semester"]
+    return {
+        "reg_number": student.reg_number,
+        "name": student.user.get_full_name(),
+        "semester": {"id": semester.id, "name": semester.name, "year": semester.year},
+        "results": [
+            {
+                "course_code": result.course.code,
+                "course_name": result.course.name,
+                "credit_hours": result.course.credit_hours,
+                "marks": result.marks,
+                "grade": result.grade_letter,
+            }
+            for result in found["results"]
+        ],
+        "gpa": found["gpa"],
+        "classification": found["classification"],
+        "status": found["status"],
+    }
+
+
+# Bulk writes skip these signals; importers invalidate explicitly
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def result_changed(sender, instance, **kwargs):
+    semester_id = instance.semester_id
+    transaction.on_commit(lambda: invalidate_semester_results([semester_id]))
@@ -0,0 +1,468 @@
+"""
+portal/importers.py
+Bulk Result Import (CSV)
+
+Uploads (CSV, or XLSX from Excel) are read with portal.csvstream and
+portal.xlsxstream, which parse them row by row; only the compact typed
+rows are kept.
+
+Courses are matched by code and semesters by id or (name, year).
+Every course, semester and student is loaded once per upload into
+a dictionary index, so each row resolves without a query.
+
+Rows are resolved, compared with existing results and written to a
+StagedResultRow table one batch at a time, so memory holds a single
+batch however large the upload is; duplicates are dropped afterwards
+in SQL, the last row for a result winning. Every upload is staged on a
+ResultImport keyed by the file's content hash: a preview is committed
+without re-reading the file, a re-upload of an applied file is
+skipped, and an interrupted import resumes from its last chunk.
+"""
+
+import csv
+import hashlib
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import connections, router, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.utils import timezone
+
+from .analytics import invalidate_course_stats
+from .csvstream import file_chunks, read_csv
+from .gpa import invalidate_semester_results
+from .models import Student, Course, Semester, Result, ResultChange, ResultImport, StagedResultRow
+from .standing import refresh_standings_on_commit
+from .xlsxstream import InvalidWorkbook, read_xlsx
+
+
+MAX_REPORTED_ERRORS = 10
+MAX_STORED_ERRORS = 1000
+WRITE_BATCH = 1000
+CHECKPOINT_ROWS = 2000   # staged rows written per transaction
+
+# Previews nobody committed are dropped after this long
+STAGED_IMPORT_TTL = timedelta(days=1)
+
+INSERT = StagedResultRow.INSERT
+UPDATE = StagedResultRow.UPDATE
+UNCHANGED = StagedResultRow.UNCHANGED
+
+
+class RowError(Exception):
+    """A row that cannot be imported; the message is shown to staff."""
+
+
+class UnreadableUpload(Exception):
+    """The file itself cannot be read; the message is shown to staff."""
+
+
+# =====================================================
+# READING UPLOADS
+# =====================================================
+IMPORT_FORMATS = (".csv", ".xlsx")
+
+
+def is_importable(file_name):
+    return file_name.lower().endswith(IMPORT_FORMATS)
+
+
+def import_source(file_name):
+    """How results written from this upload are recorded in ResultChange."""
+    return ResultChange.XLSX if file_name.lower().endswith(".xlsx") else ResultChange.CSV
+
+
+def read_upload(file, file_name):
+    """Rows of an uploaded CSV or XLSX file (any seekable binary file)."""
+    file.seek(0)
+    try:
+        if file_name.lower().endswith(".xlsx"):
+            yield from read_xlsx(file)
+        else:
+            yield from read_csv(file_chunks(file))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise UnreadableUpload(f"Could not read the file; save it as \"CSV UTF-8\" or .xlsx and try again ({e}).")
+    except InvalidWorkbook as e:
+        raise UnreadableUpload(f"Could not read the file: {e}.")
+
+
+# =====================================================
+# LOOKUP INDEX
+# =====================================================
+class LookupIndex:
+
+    def __init__(self):
+        self.students = dict(Student.objects.values_list("reg_number", "id"))
+
+        self.courses_by_code = {}
+        self.courses_by_name = defaultdict(list)
+        for course_id, code, name in Course.objects.values_list("id", "code", "name"):
+            self.courses_by_code[code.strip().upper()] = course_id
+            self.courses_by_name[name.strip().casefold()].append(course_id)
+
+        self.semester_ids = set()
+        self.semesters_by_name_year = {}
+        self.semesters_by_name = defaultdict(list)
+        for semester_id, name, year in Semester.objects.values_list("id", "name", "year"):
+            self.semester_ids.add(semester_id)
+            self.semesters_by_name_year[(name.strip().casefold(), year)] = semester_id
+            self.semesters_by_name[name.strip().casefold()].append(semester_id)
+
+    def student(self, row):
+        reg_number = (row.get("reg_number") or "").strip()
+        try:
+            return self.students[reg_number]
+        except KeyError:
+            raise RowError(f"unknown student '{reg_number}'")
+
+    def course(self, row):
+        code = (row.get("course_code") or "").strip()
+        if code:
+            try:
+                return self.courses_by_code[code.upper()]
+            except KeyError:
+                raise RowError(f"unknown course code '{code}'")
+
+        # Legacy templates: course name, accepted only when unambiguous
+        name = (row.get("course") or "").strip()
+        matches = self.courses_by_name.get(name.casefold(), [])
+        if not matches:
+            raise RowError(f"unknown course '{name}'")
+        if len(matches) > 1:
+            raise RowError(f"course name '{name}' is ambiguous, use course_code")
+        return matches[0]
+
+    def semester(self, row):
+        semester_id = (row.get("semester_id") or "").strip()
+        if semester_id:
+            if semester_id.isdigit() and int(semester_id) in self.semester_ids:
+                return int(semester_id)
+            raise RowError(f"unknown semester id '{semester_id}'")
+
+        name = (row.get("semester") or "").strip()
+        year = (row.get("semester_year") or "").strip()
+        if year:
+            try:
+                return self.semesters_by_name_year[(name.casefold(), int(year))]
+            except (KeyError, ValueError):
+                raise RowError(f"unknown semester '{name} ({year})'")
+
+        # Legacy templates: semester name only, accepted only when unambiguous
+        matches = self.semesters_by_name.get(name.casefold(), [])
+        if not matches:
+            raise RowError(f"unknown semester '{name}'")
+        if len(matches) > 1:
+            raise RowError(f"semester '{name}' exists in several years, add semester_year or semester_id")
+        return matches[0]
+
+
+def parse_marks(row):
+    raw = (row.get("marks") or "").strip()
+    try:
+        marks = float(raw)
+    except ValueError:
+        raise RowError(f"invalid marks '{raw}'")
+    if not 0 <= marks <= 100:
+        raise RowError(f"marks {raw} out of range 0-100")
+    return marks
+
+
+# =====================================================
+# COMPARE & WRITE
+# =====================================================
+def compare(staged):
+    """
+    Classify staged [line, student_id, course_id, semester_id, marks]
+    rows against existing results with a single query.
+
+    Returns the rows extended with [old_marks, change] and the existing
+    result ids keyed by (student_id, course_id, semester_id).
+    """
+    existing = {}
+    if staged:
+        current = Result.objects.filter(
+            student_id__in={row[1] for row in staged},
+            course_id__in={row[2] for row in staged},
+            semester_id__in={row[3] for row in staged},
+        ).values_list("id", "student_id", "course_id", "semester_id", "marks")
+
+        for result_id, student_id, course_id, semester_id, marks in current.iterator(chunk_size=WRITE_BATCH):
+            existing[(student_id, course_id, semester_id)] = (result_id, marks)
+
+    compared = []
+    for line, student_id, course_id, semester_id, marks in staged:
+        match = existing.get((student_id, course_id, semester_id))
+        if match is None:
+            old_marks, change = None, INSERT
+        elif match[1] == marks:
+            old_marks, change = match[1], UNCHANGED
+        else:
+            old_marks, change = match[1], UPDATE
+        compared.append([line, student_id, course_id, semester_id, marks, old_marks, change])
+
+    return compared, existing
+
+
+def apply(staged, changed_by=None, source=ResultChange.CSV):
+    """
+    Write staged rows, and one audit entry per changed result, in one
+    transaction. Returns counts per change.
+    """
+    compared, existing = compare(staged)
+    now = timezone.now()
+
+    inserts = []
+    updates = []
+    changes = []
+    for _, student_id, course_id, semester_id, marks, old_marks, change in compared:
+        if change == UNCHANGED:
+            continue
+
+        if change == INSERT:
+            inserts.append(Result(
+                student_id=student_id,
+                course_id=course_id,
+                semester_id=semester_id,
+                marks=marks,
+            ))
+        else:
+            result_id = existing[(student_id, course_id, semester_id)][0]
+            updates.append(Result(id=result_id, marks=marks, updated_at=now))
+
+        changes.append(ResultChange(
+            student_id=student_id,
+            course_id=course_id,
+            semester_id=semester_id,
+            old_marks=old_marks,
+            new_marks=marks,
+            source=source,
+            changed_by=changed_by,
+            changed_at=now,
+        ))
+
+    with transaction.atomic():
+        Result.objects.bulk_create(inserts, batch_size=WRITE_BATCH)
+        Result.objects.bulk_update(updates, ["marks", "updated_at"], batch_size=WRITE_BATCH)
+        ResultChange.objects.bulk_create(changes, batch_size=WRITE_BATCH)
+
+        transaction.on_commit(
+            lambda: invalidate_course_stats(change.course_id for change in changes)
+        )
+        transaction.on_commit(
+            lambda: invalidate_semester_results(change.semester_id for change in changes)
+        )
+        refresh_standings_on_commit(change.student_id for change in changes)
+
+    return Counter(row[6] for row in compared)
+
+
+STAGED_ROW_COLUMNS = (
+    "result_import_id", "line", "student_id", "course_id", "semester_id", "marks", "old_marks", "change",
+)
+
+
+def insert_staged_rows(result_import_id, compared):
+    """
+    Insert compared rows with one executemany. Staging writes every row
+    of the file, and building a model instance per row made bulk_create
+    the bottleneck (about 3,000 rows/s); plain tuples are much faster.
+    """
+    using = router.db_for_write(StagedResultRow)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        quote(StagedResultRow._meta.db_table),
+        ", ".join(quote(column) for column in STAGED_ROW_COLUMNS),
+        ", ".join(["%s"] * len(STAGED_ROW_COLUMNS)),
+    )
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.executemany(sql, [(result_import_id, *row) for row in compared])
+
+
+# =====================================================
+# IMPORTER
+# =====================================================
+class ResultImporter:
+
+    def __init__(self):
+        self.index = LookupIndex()
+        self.skipped_count = 0
+        self.error_count = 0
+        self.errors = []
+
+    def error(self, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_STORED_ERRORS:
+            self.errors.append(message)
+
+    def resolve(self, row):
+        return (
+            self.index.student(row),
+            self.index.course(row),
+            self.index.semester(row),
+            parse_marks(row),
+        )
+
+    def stage_batches(self, rows, batch_size=WRITE_BATCH):
+        """
+        Resolve and validate rows as they are read, yielding typed
+        [line, student_id, course_id, semester_id, marks] rows in batches.
+        Duplicates are left in; stage() removes them in SQL.
+        """
+        batch = []
+
+        # Line 1 is the header
+        for line, row in enumerate(rows, start=2):
+
+            # Pre-filled templates list every student; blank marks are not results yet
+            if not (row.get("marks") or "").strip():
+                self.skipped_count += 1
+                continue
+
+            try:
+                student_id, course_id, semester_id, marks = self.resolve(row)
+            except RowError as e:
+                self.error(f"Row {line}: {e}")
+                continue
+
+            batch.append([line, student_id, course_id, semester_id, marks])
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    def stage(self, rows, uploaded_by, file_name, content_hash):
+        """
+        Resolve, validate and compare rows into a new ResultImport's
+        staged rows, one batch at a time. Nothing is written to Result.
+        """
+        ResultImport.objects.filter(
+            status__in=[ResultImport.STAGING, ResultImport.STAGED],
+            created_at__lt=timezone.now() - STAGED_IMPORT_TTL,
+        ).delete()
+
+        # STAGING until every row is in: find_import and commit_import skip it
+        staged_import = ResultImport.objects.create(
+            uploaded_by=uploaded_by,
+            file_name=file_name,
+            content_hash=content_hash,
+            status=ResultImport.STAGING,
+        )
+
+        try:
+            for batch in self.stage_batches(rows):
+                compared, _ = compare(batch)
+                insert_staged_rows(staged_import.pk, compared)
+
+            self.drop_duplicates(staged_import)
+        except BaseException:
+            staged_import.delete()
+            raise
+
+        counts = Counter(dict(
+            staged_import.staged_rows.order_by().values_list("change").annotate(Count("id"))
+        ))
+
+        staged_import.status = ResultImport.STAGED
+        staged_import.errors = self.errors
+        staged_import.error_count = self.error_count
+        staged_import.insert_count = counts[INSERT]
+        staged_import.update_count = counts[UPDATE]
+        staged_import.unchanged_count = counts[UNCHANGED]
+        staged_import.skipped_count = self.skipped_count
+        staged_import.save()
+
+        return staged_import
+
+    def drop_duplicates(self, staged_import):
+        """
+        The last row for each (student, course, semester) wins, as when
+        rows were applied one by one; earlier ones are dropped, so fixes
+        appended to a re-uploaded file take effect.
+        """
+        rows = staged_import.staged_rows
+        last_line = rows.filter(
+            student_id=OuterRef("student_id"),
+            course_id=OuterRef("course_id"),
+            semester_id=OuterRef("semester_id"),
+        ).order_by("-line").values("line")[:1]
+
+        superseded = rows.annotate(last_line=Subquery(last_line)).filter(line__lt=F("last_line"))
+
+        StagedResultRow.objects.filter(pk__in=superseded.values("pk")).delete()
+
+
+# =====================================================
+# IDEMPOTENT, RESUMABLE COMMIT
+# =====================================================
+def content_hash(chunks):
+    """SHA-256 of a file read as chunks of bytes."""
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_import(digest):
+    """
+    The import for a file with this content hash: committed (nothing to
+    do) or still staged (preview it or resume it), preferring committed.
+    """
+    return ResultImport.objects.filter(content_hash=digest).exclude(status=ResultImport.STAGING).order_by(
+        F("committed_at").desc(nulls_last=True), "-created_at"
+    ).first()
+
+
+def commit_import(staged_import, changed_by=None):
+    """
+    Write a staged upload in checkpointed chunks, in file order. Each
+    chunk and its checkpoint (rows_applied) commit together, so an
+    interrupted import resumes from the last committed chunk. Every
+    chunk is compared with current results first, so results edited
+    since staging are respected.
+
+    Returns counts per change for the chunks written by this call, or
+    None if the import was already committed.
+    """
+    rows = staged_import.staged_rows.order_by("line").values_list(
+        "line", "student_id", "course_id", "semester_id", "marks"
+    )
+    source = import_source(staged_import.file_name)
+    counts = Counter()
+
+    start = staged_import.rows_applied
+    last_line = rows[start - 1][0] if start else 0
+
+    while True:
+        with transaction.atomic():
+            locked = ResultImport.objects.select_for_update().filter(
+                pk=staged_import.pk, status=ResultImport.STAGED, rows_applied=start
+            ).first()
+            if locked is None:
+                return None
+
+            chunk = list(rows.filter(line__gt=last_line)[:CHECKPOINT_ROWS])
+            if not chunk:
+                break
+
+            counts += apply(chunk, changed_by, source)
+
+            start += len(chunk)
+            last_line = chunk[-1][0]
+            locked.rows_applied = start
+            locked.save(update_fields=["rows_applied", "updated_at"])
+
+    updated = ResultImport.objects.filter(
+        pk=staged_import.pk, status=ResultImport.STAGED
+    ).update(status=ResultImport.COMMITTED, committed_at=timezone.now(), updated_at=timezone.now())
+
+    return counts if updated else None
+
+
+def reported_errors(errors, error_count):
+    shown = errors[:MAX_REPORTED_ERRORS]
+    if error_count > len(shown):
+        shown.append(f"... and {error_count - len(shown)} more")
+    return shown
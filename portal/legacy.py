@@ -0,0 +1,179 @@
+"""
+portal/legacy.py
+Exams App Data Migration
+
+Copies the exams app's semesters, courses, students and results into
+the portal tables in batched bulk inserts. Rows already in the portal
+(same semester name and year, course code, reg number or result) are
+kept as they are, so the copy can be re-run safely.
+
+Takes an app registry: the historical one inside a migration, or
+django.apps.apps from the management command.
+"""
+
+from django.contrib.auth.hashers import make_password
+
+
+BATCH_SIZE = 1000
+DEFAULT_PROGRAM = "Not Assigned"   # as for self-registered students
+
+
+def _batches(queryset, batch_size):
+    batch = []
+    for row in queryset.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def copy_exams_data(apps, batch_size=BATCH_SIZE, log=None):
+    """Returns the number of rows created per model, and rows skipped."""
+    log = log or (lambda message: None)
+
+    ExamSemester = apps.get_model("exams", "Semester")
+    ExamCourse = apps.get_model("exams", "Course")
+    ExamStudent = apps.get_model("exams", "Student")
+    ExamResult = apps.get_model("exams", "Result")
+
+    User = apps.get_model("auth", "User")
+    Semester = apps.get_model("portal", "Semester")
+    Course = apps.get_model("portal", "Course")
+    Student = apps.get_model("portal", "Student")
+    Result = apps.get_model("portal", "Result")
+
+    counts = {"semesters": 0, "courses": 0, "students": 0, "results": 0, "skipped": 0}
+
+    # -------------------------------------------------
+    # SEMESTERS: (name, start year)
+    # -------------------------------------------------
+    semesters = {(name, year): semester_id for semester_id, name, year in Semester.objects.values_list("id", "name", "year")}
+    new = {}
+    for name, start_date in ExamSemester.objects.values_list("name", "start_date"):
+        key = (name[:50], start_date.year)
+        if key not in semesters:
+            new[key] = Semester(name=key[0], year=key[1])
+    Semester.objects.bulk_create(new.values(), batch_size=batch_size, ignore_conflicts=True)
+    counts["semesters"] = len(new)
+
+    semesters = {(name, year): semester_id for semester_id, name, year in Semester.objects.values_list("id", "name", "year")}
+    semester_map = {
+        exam_id: semesters[(name[:50], start_date.year)]
+        for exam_id, name, start_date in ExamSemester.objects.values_list("id", "name", "start_date")
+    }
+
+    # -------------------------------------------------
+    # COURSES: code
+    # -------------------------------------------------
+    courses = {code.upper(): course_id for course_id, code in Course.objects.values_list("id", "code")}
+    new = {}
+    for code, name, credit_hours in ExamCourse.objects.values_list("code", "name", "credit_hours"):
+        if code.upper() not in courses:
+            new[code.upper()] = Course(code=code, name=name[:150], credit_hours=max(credit_hours, 1))
+    Course.objects.bulk_create(new.values(), batch_size=batch_size, ignore_conflicts=True)
+    counts["courses"] = len(new)
+
+    courses = {code.upper(): course_id for course_id, code in Course.objects.values_list("id", "code")}
+    course_map = {
+        exam_id: courses[code.upper()]
+        for exam_id, code in ExamCourse.objects.values_list("id", "code")
+    }
+
+    # -------------------------------------------------
+    # STUDENTS: reg number; each gets a login
+    # -------------------------------------------------
+    max_reg_length = Student._meta.get_field("reg_number").max_length
+    unusable_password = make_password(None)
+
+    student_map = {}
+    for batch in _batches(ExamStudent.objects.order_by("id"), batch_size):
+        reg_numbers = []
+        for exam_student in batch:
+            reg_number = exam_student.registration_number.strip()
+            if len(reg_number) > max_reg_length:
+                log(f"Skipped student '{reg_number}': reg number longer than {max_reg_length}")
+                counts["skipped"] += 1
+                continue
+            reg_numbers.append((exam_student, reg_number))
+
+        existing = dict(Student.objects.filter(
+            reg_number__in=[reg_number for _, reg_number in reg_numbers]
+        ).values_list("reg_number", "id"))
+        users = dict(User.objects.filter(
+            username__in=[reg_number for _, reg_number in reg_numbers]
+        ).values_list("username", "id"))
+
+        new_users = []
+        for exam_student, reg_number in reg_numbers:
+            if reg_number in existing or reg_number in users:
+                continue
+            first_name, _, last_name = exam_student.name.strip().partition(" ")
+            new_users.append(User(
+                username=reg_number,
+                first_name=first_name[:150],
+                last_name=last_name[:150],
+                email=exam_student.email or "",
+                password=unusable_password,
+            ))
+        User.objects.bulk_create(new_users, batch_size=batch_size, ignore_conflicts=True)
+
+        users = dict(User.objects.filter(
+            username__in=[reg_number for _, reg_number in reg_numbers]
+        ).values_list("username", "id"))
+        linked = set(Student.objects.filter(user_id__in=users.values()).values_list("user_id", flat=True))
+
+        new_students = []
+        for exam_student, reg_number in reg_numbers:
+            if reg_number in existing:
+                continue
+            if users[reg_number] in linked:
+                log(f"Skipped student '{reg_number}': user '{reg_number}' already has another student profile")
+                counts["skipped"] += 1
+                continue
+            new_students.append(Student(
+                user_id=users[reg_number],
+                reg_number=reg_number,
+                program=DEFAULT_PROGRAM,
+                year=1,
+            ))
+        Student.objects.bulk_create(new_students, batch_size=batch_size, ignore_conflicts=True)
+        counts["students"] += len(new_students)
+
+        students = dict(Student.objects.filter(
+            reg_number__in=[reg_number for _, reg_number in reg_numbers]
+        ).values_list("reg_number", "id"))
+        for exam_student, reg_number in reg_numbers:
+            if reg_number in students:
+                student_map[exam_student.id] = students[reg_number]
+
+    # -------------------------------------------------
+    # RESULTS: existing portal results win
+    # -------------------------------------------------
+    before = Result.objects.count()
+
+    rows = ExamResult.objects.order_by("id").values_list("id", "student_id", "course_id", "semester_id", "score")
+    for batch in _batches(rows, batch_size):
+        results = []
+        for result_id, student_id, course_id, semester_id, score in batch:
+            if student_id not in student_map:
+                counts["skipped"] += 1
+                continue
+            if not 0 <= score <= 100:
+                log(f"Skipped exams result {result_id}: score {score} out of range 0-100")
+                counts["skipped"] += 1
+                continue
+            results.append(Result(
+                student_id=student_map[student_id],
+                course_id=course_map[course_id],
+                semester_id=semester_map[semester_id],
+                marks=float(score),
+            ))
+
+        Result.objects.bulk_create(results, batch_size=batch_size, ignore_conflicts=True)
+        log(f"Copied results up to exams result {batch[-1][0]}")
+
+    counts["results"] = Result.objects.count() - before
+
+    return counts
@@ -0,0 +1,259 @@
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+
+from portal.models import Student, Course, Semester, Result
+
+
+class Command(BaseCommand):
+    help = "Run local performance benchmarks (run against a local database, never production)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("target", choices=["requests", "http", "transcript", "csv"], help="Benchmark to run")
+        parser.add_argument("--url", default="/", help="URL to request")
+        parser.add_argument(
+            "--base-url",
+            default="http://127.0.0.1:8000",
+            help="Running server to hit (http benchmark), e.g. gunicorn -c gunicorn.conf.py",
+        )
+        parser.add_argument("--user", default="", help="Username to log in as before requesting")
+        parser.add_argument("--requests", type=int, default=500, help="Total number of requests")
+        parser.add_argument("--threads", type=int, default=8, help="Concurrent client threads")
+        parser.add_argument("--results", type=int, default=40, help="Results per transcript (transcript benchmark)")
+        parser.add_argument("--repeat", type=int, default=200, help="PDFs to render (transcript benchmark)")
+        parser.add_argument("--sizes", default="1,50,500", help="CSV sizes in MB (csv benchmark)")
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="Also measure reading the whole file (the old upload_results path; needs ~4x the file in RAM)",
+        )
+
+    def handle(self, *args, **options):
+        getattr(self, f"bench_{options['target']}")(options)
+
+    # =====================================================
+    # REQUEST THROUGHPUT
+    # Run twice (DATABASE_CONN_MAX_AGE=0 / 600) against a local
+    # PostgreSQL to compare connection churn with persistent connections.
+    # =====================================================
+    def bench_requests(self, options):
+        url = options["url"]
+        total = options["requests"]
+        threads = options["threads"]
+
+        user = None
+        if options["user"]:
+            user = User.objects.filter(username=options["user"]).first()
+            if not user:
+                raise CommandError(f"No User found with username {options['user']}")
+
+        database = settings.DATABASES["default"]
+        self.stdout.write(
+            f"Engine: {database['ENGINE']} | CONN_MAX_AGE: {database.get('CONN_MAX_AGE', 0)} | "
+            f"Health checks: {database.get('CONN_HEALTH_CHECKS', False)}"
+        )
+
+        def worker(count):
+            client = Client(raise_request_exception=False, HTTP_HOST="localhost")
+            if user:
+                client.force_login(user)
+
+            statuses = []
+            for _ in range(count):
+                statuses.append(client.get(url).status_code)
+
+            connections.close_all()
+            return statuses
+
+        per_thread = [total // threads + (1 if i < total % threads else 0) for i in range(threads)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            statuses = [code for chunk in executor.map(worker, per_thread) for code in chunk]
+        elapsed = time.perf_counter() - start
+
+        errors = len([code for code in statuses if code >= 400])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(statuses)} requests to {url} in {elapsed:.2f}s "
+            f"({len(statuses) / elapsed:.1f} req/s, {errors} errors)"
+        ))
+
+    # =====================================================
+    # HTTP THROUGHPUT AGAINST A RUNNING SERVER
+    # Validates gunicorn.conf.py (worker class, count,
+    # preload) on local hardware end to end.
+    # =====================================================
+    def bench_http(self, options):
+        url = options["base_url"].rstrip("/") + options["url"]
+        total = options["requests"]
+        threads = options["threads"]
+
+        def fetch(_):
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=60) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except urllib.error.URLError:
+                status = 599
+            return status, time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            samples = list(executor.map(fetch, range(total)))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(duration for _, duration in samples)
+        errors = len([status for status, _ in samples if status >= 400])
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} requests to {url} in {elapsed:.2f}s "
+            f"({total / elapsed:.1f} req/s, {errors} errors) | "
+            f"p50 {percentile(0.50):.1f}ms p95 {percentile(0.95):.1f}ms p99 {percentile(0.99):.1f}ms"
+        ))
+
+    # =====================================================
+    # TRANSCRIPT PDF RENDERING (no database needed)
+    # "fresh" builds the page template and header flowables
+    # for every PDF; "shared" reuses the per-thread renderer.
+    # Styles and table geometry are module-level in both.
+    # =====================================================
+    def bench_transcript(self, options):
+        from portal.transcripts import TranscriptRenderer, get_renderer
+
+        user = User(first_name="Benchmark", last_name="Student")
+        student = Student(user=user, reg_number="BENCH/001", program="Forestry", year=3)
+        semester = Semester(name="Semester 1", year=2025)
+
+        results = [
+            Result(
+                student=student,
+                course=Course(code=f"FOR{i:03}", name=f"Forestry Course {i}", credit_hours=3),
+                semester=semester,
+                marks=30 + (i * 7) % 70,
+            )
+            for i in range(options["results"])
+        ]
+
+        repeat = options["repeat"]
+
+        def run(label, render):
+            render(student, results, 2.75, "Lower Credit")  # warm up
+            start = time.perf_counter()
+            for _ in range(repeat):
+                render(student, results, 2.75, "Lower Credit")
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{label:>7}: {repeat / elapsed:7.1f} PDFs/sec ({elapsed / repeat * 1000:.2f} ms each)"
+            )
+            return repeat / elapsed
+
+        self.stdout.write(f"Rendering {repeat} transcripts with {len(results)} results each")
+        before = run("fresh", lambda *args: TranscriptRenderer().render(*args))
+        after = run("shared", get_renderer().render)
+
+        self.stdout.write(self.style.SUCCESS(f"Speed-up: {after / before:.2f}x"))
+
+    # =====================================================
+    # CSV INGESTION MEMORY
+    # Peak Python memory while results CSVs of growing size
+    # go through upload_results' staging path
+    # (ResultImporter.stage into StagedResultRow); it should
+    # stay flat. Fixtures and staged rows are rolled back.
+    # =====================================================
+    def bench_csv(self, options):
+        import csv
+        import os
+        import tempfile
+        import tracemalloc
+
+        from django.db import transaction
+        from django.test.utils import override_settings
+
+        from portal.importers import ResultImporter, read_upload
+
+        students = 2000
+        courses = 40
+        rows_per_semester = students * courses
+
+        def write_csv(path, size_mb):
+            # Every row is a distinct (student, course, semester), as in a real upload
+            with open(path, "w", encoding="utf-8-sig", newline="") as target:
+                writer = csv.writer(target)
+                writer.writerow(["reg_number", "course_code", "semester_id", "marks"])
+                line = 0
+                while target.tell() < size_mb * 1024 * 1024:
+                    writer.writerows(
+                        [
+                            f"BENCH/{n % students:05}",
+                            f"BENCH{n // students % courses:03}",
+                            str(semester_ids[n // rows_per_semester % len(semester_ids)]),
+                            str(n % 101),
+                        ]
+                        for n in range(line, line + 10000)
+                    )
+                    line += 10000
+
+        def stage(path):
+            with open(path, "rb") as source:
+                staged_import = ResultImporter().stage(
+                    read_upload(source, path), None, os.path.basename(path), "benchmark"
+                )
+            return staged_import.row_count + staged_import.error_count
+
+        def parse_whole(path):
+            with open(path, "rb") as source:
+                data = source.read()
+            return sum(1 for _ in csv.DictReader(data.decode("utf-8-sig").splitlines()))
+
+        def measure(parse, path):
+            tracemalloc.start()
+            start = time.perf_counter()
+            rows = parse(path)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return rows, peak / (1024 * 1024), elapsed
+
+        # DEBUG keeps every query's SQL, which would dominate the measurement
+        with override_settings(DEBUG=False), transaction.atomic(), tempfile.TemporaryDirectory() as directory:
+            for n in range(students):
+                User.objects.create(username=f"BENCH/{n:05}")
+            Course.objects.bulk_create(
+                Course(code=f"BENCH{n:03}", name=f"Benchmark Course {n}", credit_hours=3)
+                for n in range(courses)
+            )
+            semester_ids = [
+                semester.id for semester in Semester.objects.bulk_create(
+                    Semester(name=f"Benchmark {n}", year=2000 + n) for n in range(200)
+                )
+            ]
+
+            for size_mb in (int(size) for size in options["sizes"].split(",")):
+                path = os.path.join(directory, f"results_{size_mb}mb.csv")
+                write_csv(path, size_mb)
+
+                rows, peak, elapsed = measure(stage, path)
+                report = f"{size_mb:>5} MB, {rows:>9} rows | staging: peak {peak:7.2f} MB, {elapsed:6.2f}s"
+
+                if options["compare"]:
+                    _, peak, elapsed = measure(parse_whole, path)
+                    report += f" | whole file: peak {peak:8.2f} MB, {elapsed:6.2f}s"
+
+                self.stdout.write(report)
+                os.remove(path)
+
+            transaction.set_rollback(True)
@@ -0,0 +1,97 @@
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.utils import get_app_template_dirs
+
+
+STYLESHEET = Path(__file__).resolve().parents[2] / "static" / "vendor" / "bootstrap-icons" / "bootstrap-icons.css"
+
+ICON_CLASS = re.compile(r"\bbi-([a-z0-9]+(?:-[a-z0-9]+)*)")
+SYMBOL = re.compile(r'<symbol\b[^>]*\bid="([^"]+)"[^>]*>(.*?)</symbol>', re.S)
+VIEW_BOX = re.compile(r'\bviewBox="([^"]+)"')
+
+HEADER = """/*!
+ * Bootstrap Icons v1.11 (https://icons.getbootstrap.com/), subset
+ * Copyright 2019-2023 The Bootstrap Authors
+ * Licensed under MIT (https://github.com/twbs/icons/blob/main/LICENSE)
+ *
+ * Generated by "manage.py build_icons" with only the icons the templates
+ * use; run it again after adding a new bi-* class. Icons are masks filled
+ * with currentColor, so they size and colour like the icon font did.
+ */
+.bi::before,[class^="bi-"]::before,[class*=" bi-"]::before{content:"";display:inline-block;width:1em;height:1em;vertical-align:-.125em;background-color:currentColor;-webkit-mask:var(--bi) no-repeat center/contain;mask:var(--bi) no-repeat center/contain}
+"""
+
+
+def template_dirs():
+    dirs = [Path(d) for engine in settings.TEMPLATES for d in engine.get("DIRS", [])]
+    return dirs + [Path(d) for d in get_app_template_dirs("templates")]
+
+
+def used_icons():
+    icons = set()
+    for directory in template_dirs():
+        for path in directory.rglob("*.html"):
+            icons.update(ICON_CLASS.findall(path.read_text(encoding="utf-8")))
+    return icons
+
+
+def built_icons():
+    if not STYLESHEET.exists():
+        return set()
+    return set(re.findall(r"^\.bi-([a-z0-9-]+)\{", STYLESHEET.read_text(encoding="utf-8"), re.M))
+
+
+def data_uri(view_box, body):
+    svg = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{view_box}">{body.strip()}</svg>'
+    svg = svg.replace('"', "'")
+    for char, escaped in (("%", "%25"), ("#", "%23"), ("<", "%3C"), (">", "%3E"), ("\n", "")):
+        svg = svg.replace(char, escaped)
+    return f'url("data:image/svg+xml,{svg}")'
+
+
+class Command(BaseCommand):
+    help = "Build the bootstrap-icons subset stylesheet from the icons used in templates"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sprite",
+            help="bootstrap-icons.svg from a bootstrap-icons release (required unless --check)",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report icons used in templates that the stylesheet lacks",
+        )
+
+    def handle(self, *args, **options):
+        icons = used_icons()
+
+        if options["check"]:
+            missing = sorted(icons - built_icons())
+            if missing:
+                raise CommandError(f"Missing from {STYLESHEET.name}: {', '.join(missing)}")
+            self.stdout.write(self.style.SUCCESS(f"All {len(icons)} icons are built"))
+            return
+
+        if not options["sprite"]:
+            raise CommandError("--sprite is required to build the stylesheet.")
+
+        symbols = {}
+        for symbol in SYMBOL.finditer(Path(options["sprite"]).read_text(encoding="utf-8")):
+            view_box = VIEW_BOX.search(symbol.group(0))
+            symbols[symbol.group(1)] = data_uri(view_box.group(1) if view_box else "0 0 16 16", symbol.group(2))
+
+        unknown = sorted(icons - symbols.keys())
+        if unknown:
+            raise CommandError(f"Not in the sprite: {', '.join(unknown)}")
+
+        rules = [f".bi-{name}{{--bi:{symbols[name]}}}\n" for name in sorted(icons)]
+        STYLESHEET.parent.mkdir(parents=True, exist_ok=True)
+        STYLESHEET.write_text(HEADER + "".join(rules), encoding="utf-8")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(icons)} of {len(symbols)} icons to {STYLESHEET}"
+        ))
@@ -0,0 +1,45 @@
+import os
+import shutil
+
+from django.core.management.base import BaseCommand, CommandError
+from portal.db_router import read_replica
+from portal.exports import HEADER, filter_results, result_rows, csv_chunks, xlsx_tempfile
+
+class Command(BaseCommand):
+    help = "Export results (optionally filtered) to CSV or Excel without loading them all into memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--semester", type=int, help="Semester ID")
+        parser.add_argument("--course", type=str, help="Course code")
+        parser.add_argument("--program", type=str, help="Student program")
+        parser.add_argument("--year", type=int, help="Student year of study")
+        parser.add_argument("--format", choices=["csv", "xlsx"], default="csv")
+        parser.add_argument("--output", type=str, help="Output file (default: logs/results_export.<format>)")
+
+    def handle(self, *args, **options):
+        file_format = options["format"]
+        output = options["output"] or os.path.join("logs", f"results_export.{file_format}")
+
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+
+        try:
+            # Reporting only: read from the replica when one is configured
+            with read_replica():
+                results = filter_results(
+                    semester=options["semester"],
+                    course=options["course"],
+                    program=options["program"],
+                    year=options["year"],
+                )
+
+                if file_format == "xlsx":
+                    shutil.move(xlsx_tempfile(HEADER, result_rows(results)), output)
+                else:
+                    with open(output, "w", newline="") as f:
+                        for chunk in csv_chunks(HEADER, result_rows(results)):
+                            f.write(chunk)
+
+        except Exception as e:
+            raise CommandError(f"Error exporting results: {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"Results exported to {output}"))
@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What each kind of process imports before it can do any work
+TARGETS = {
+    "manage": (
+        "import django; django.setup(); "
+        "from django.core.management import get_commands; get_commands()"
+    ),
+    "web": (
+        "import college_site_new.asgi; "
+        "from django.urls import get_resolver; get_resolver().url_patterns"
+    ),
+}
+
+# Packages that should only load on first use
+HEAVY_PACKAGES = ["reportlab", "openpyxl", "pandas", "numpy", "qrcode"]
+
+
+class Command(BaseCommand):
+    help = "Report cold-start import time (python -X importtime) for manage.py and web workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("target", nargs="?", choices=sorted(TARGETS), default="web")
+        parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to show")
+
+    def handle(self, *args, **options):
+        target = options["target"]
+
+        env = os.environ.copy()
+        env.setdefault("DJANGO_SETTINGS_MODULE", "college_site_new.settings")
+
+        start = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", TARGETS[target]],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        if process.returncode != 0:
+            raise CommandError(f"Startup failed:\n{process.stderr[-2000:]}")
+
+        # Lines look like: "import time:  self [us] | cumulative | imported package"
+        imports = []
+        for line in process.stderr.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            imports.append((int(self_us), int(cumulative_us), name.rstrip()))
+
+        top_level = [entry for entry in imports if not entry[2].startswith("  ")]
+        total_ms = sum(cumulative for _, cumulative, _ in top_level) / 1000
+
+        by_package = defaultdict(int)
+        for self_us, _, name in imports:
+            by_package[name.strip().split(".")[0]] += self_us
+
+        loaded = {name.strip() for _, _, name in imports}
+
+        self.stdout.write(self.style.SUCCESS(f"=== Startup: {target} ==="))
+        self.stdout.write(f"Process wall time: {wall_ms:.0f} ms | Import time: {total_ms:.0f} ms | Modules: {len(imports)}")
+
+        self.stdout.write(self.style.SUCCESS("\n=== Slowest top-level imports ==="))
+        for _, cumulative, name in sorted(top_level, key=lambda e: e[1], reverse=True)[:options["top"]]:
+            self.stdout.write(f"{cumulative / 1000:8.1f} ms  {name.strip()}")
+
+        self.stdout.write(self.style.SUCCESS("\n=== Packages by self time ==="))
+        for package, self_us in sorted(by_package.items(), key=lambda e: e[1], reverse=True)[:options["top"]]:
+            self.stdout.write(f"{self_us / 1000:8.1f} ms  {package}")
+
+        self.stdout.write(self.style.SUCCESS("\n=== Heavy packages at startup ==="))
+        for package in HEAVY_PACKAGES:
+            if package in loaded:
+                self.stdout.write(self.style.WARNING(f"{package}: loaded"))
+            else:
+                self.stdout.write(f"{package}: not loaded")
+
+        # Keep a history so cold start can be tracked over time
+        logs_dir = os.path.join("logs")
+        os.makedirs(logs_dir, exist_ok=True)
+        log_file = os.path.join(logs_dir, "startup_times.log")
+
+        with open(log_file, "a") as f:
+            f.write(
+                f"[{datetime.now()}] {target} wall={wall_ms:.0f}ms "
+                f"imports={total_ms:.0f}ms modules={len(imports)}\n"
+            )
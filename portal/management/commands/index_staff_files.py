@@ -0,0 +1,41 @@
+import datetime
+import os
+
+from django.core.management.base import BaseCommand
+from portal.filestore import hash_file, store_path, store_root
+from portal.models import StaffFile
+
+
+class Command(BaseCommand):
+    help = "Move files saved directly under MEDIA_ROOT/staff into the indexed staff file store"
+
+    def handle(self, *args, **options):
+        root = store_root()
+        if not os.path.isdir(root):
+            self.stdout.write("No staff files to index.")
+            return
+
+        stored = shared = 0
+
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.startswith("."):
+                    continue
+
+                sha256, size = hash_file(entry.path)
+                modified = datetime.datetime.fromtimestamp(entry.stat().st_mtime, tz=datetime.timezone.utc)
+
+                staff_file, moved = store_path(entry.path, entry.name, size, sha256)
+                StaffFile.objects.filter(pk=staff_file.pk).update(created_at=modified)
+
+                if moved:
+                    stored += 1
+                else:
+                    # The row points at the stored copy; this one is redundant
+                    os.remove(entry.path)
+                    self.stdout.write(f"{entry.name}: same content as {staff_file.path}, removed the extra copy")
+                    shared += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {stored + shared} staff files ({shared} sharing an already stored copy)"
+        ))
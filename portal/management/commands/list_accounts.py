@@ -2,11 +2,17 @@ import os
 import csv
 from django.core.management.base import BaseCommand
 from portal.models import Student, Staff
+from portal.db_router import read_replica
 
 class Command(BaseCommand):
     help = "List all current student registration numbers and staff IDs, and export to CSV"
 
     def handle(self, *args, **options):
+        # Reporting only: read from the replica when one is configured
+        with read_replica():
+            self.list_accounts()
+
+    def list_accounts(self):
         # Prepare data
         students = Student.objects.all().order_by("reg_number")
         staff_members = Staff.objects.all().order_by("staff_id")
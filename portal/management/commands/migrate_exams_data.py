@@ -0,0 +1,35 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from portal.gpa import invalidate_semester_results
+from portal.legacy import BATCH_SIZE, copy_exams_data
+from portal.models import Semester, Student
+from portal.standing import refresh_standings
+
+
+class Command(BaseCommand):
+    help = "Copy exams app semesters, courses, students and results into the portal (safe to re-run)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+
+        counts = copy_exams_data(
+            apps,
+            batch_size=options["batch_size"],
+            log=self.stdout.write if options["verbosity"] > 1 else None,
+        )
+
+        # Bulk inserts skip the result signals
+        refresh_standings(Student.objects.values_list("id", flat=True))
+        invalidate_semester_results(Semester.objects.values_list("id", flat=True))
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Copied {counts['semesters']} semesters, {counts['courses']} courses, "
+            f"{counts['students']} students and {counts['results']} results "
+            f"({counts['skipped']} skipped) in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+from portal.models import Student
+from portal.standing import refresh_standings
+
+
+class Command(BaseCommand):
+    help = "Rebuild every student's at-risk standing (normally kept up to date as results change)"
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+
+        student_ids = list(Student.objects.values_list("id", flat=True))
+        refresh_standings(student_ids)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {len(student_ids)} student standings in {elapsed:.2f}s"
+        ))
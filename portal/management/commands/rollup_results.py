@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from portal.analytics import rollup_results
+from portal.models import Semester
+
+
+class Command(BaseCommand):
+    help = "Rebuild the (program, year, semester, course) results rollup used by trend analytics"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--semester", type=int, help="Only rebuild this semester id")
+
+    def handle(self, *args, **options):
+        semester_id = options["semester"]
+
+        if semester_id is not None and not Semester.objects.filter(pk=semester_id).exists():
+            raise CommandError(f"Semester {semester_id} does not exist.")
+
+        start = time.perf_counter()
+        rows = rollup_results(semester_id)
+        elapsed = time.perf_counter() - start
+
+        scope = f"semester {semester_id}" if semester_id is not None else "all semesters"
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up {scope}: {rows} rows in {elapsed:.2f}s"
+        ))
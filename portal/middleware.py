@@ -0,0 +1,84 @@
+"""
+portal/middleware.py
+Project Middleware
+"""
+
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+timing_logger = logging.getLogger("portal.timing")
+
+
+# =====================================================
+# PER-REQUEST TIMING
+# =====================================================
+class RequestTimingMiddleware:
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.log(request, response, start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.log(request, response, start)
+        return response
+
+    @staticmethod
+    def log(request, response, start):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        timing_logger.info(
+            "%s %s %s %.1fms",
+            request.method,
+            request.path,
+            response.status_code,
+            elapsed_ms,
+        )
+
+
+# =====================================================
+# ASYNC-CAPABLE WHITENOISE
+# WhiteNoise's middleware is sync-only, which forces Django
+# to run every ASGI request through a thread. Static file
+# lookups are in-memory, so they are safe to do on the loop.
+# =====================================================
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.2 on 2026-10-19 11:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0002_alter_course_credit_hours_alter_result_marks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('file_name', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('staging', 'Staging'), ('staged', 'Staged'), ('committed', 'Committed')], db_index=True, default='staged', max_length=20)),
+                ('errors', models.JSONField(default=list)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('insert_count', models.PositiveIntegerField(default=0)),
+                ('update_count', models.PositiveIntegerField(default=0)),
+                ('unchanged_count', models.PositiveIntegerField(default=0)),
+                ('skipped_count', models.PositiveIntegerField(default=0)),
+                ('committed_at', models.DateTimeField(blank=True, null=True)),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='result_imports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StagedResultRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('line', models.PositiveIntegerField()),
+                ('marks', models.FloatField()),
+                ('old_marks', models.FloatField(blank=True, null=True)),
+                ('change', models.CharField(choices=[('insert', 'Insert'), ('update', 'Update'), ('unchanged', 'Unchanged')], max_length=10)),
+                ('course', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='portal.course')),
+                ('result_import', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='staged_rows', to='portal.resultimport')),
+                ('semester', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='portal.semester')),
+                ('student', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='portal.student')),
+            ],
+            options={
+                'ordering': ['line'],
+                'indexes': [models.Index(fields=['result_import', 'change', 'line'], name='portal_stag_result__ee634e_idx'), models.Index(fields=['result_import', 'student', 'course', 'semester', 'line'], name='portal_stag_result__70e231_idx')],
+                'constraints': [models.UniqueConstraint(fields=('result_import', 'line'), name='unique_staged_row_line')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.2 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0003_resultimport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultimport',
+            name='content_hash',
+            field=models.CharField(db_index=True, default='', max_length=64),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='resultimport',
+            name='rows_applied',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.2 on 2026-10-19 13:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0005_resultchange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('program', models.CharField(max_length=150)),
+                ('year', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField()),
+                ('marks_sum', models.FloatField()),
+                ('marks_sum_squares', models.FloatField()),
+                ('passed', models.PositiveIntegerField()),
+                ('repeat', models.PositiveIntegerField()),
+                ('grade_counts', models.JSONField(default=list)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='portal.course')),
+                ('semester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='portal.semester')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course', 'semester'], name='portal_resu_course__bcf527_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='resultrollup',
+            constraint=models.UniqueConstraint(fields=('program', 'year', 'semester', 'course'), name='unique_result_rollup'),
+        ),
+    ]
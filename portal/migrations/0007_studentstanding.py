@@ -0,0 +1,141 @@
+# Generated by Django 5.0.2 on 2026-10-19 14:10
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import DEFAULT_DB_ALIAS, migrations, models
+
+
+# portal.standing as of this migration, inlined so later changes to the
+# app code do not change what migrating an old database produces
+AT_RISK_GPA = 1.5
+GPA_DROP_THRESHOLD = 0.5
+PASS_MARK = 40
+REPEAT_MARK = 30
+BATCH_SIZE = 1000
+
+# Result.grade_point: (lowest mark, grade point)
+GRADE_POINTS = [(80, 4.0), (70, 3.5), (65, 3.0), (50, 2.0), (40, 1.0), (0, 0.0)]
+
+
+def grade_point(marks):
+    return next((point for lowest, point in GRADE_POINTS if marks >= lowest), 0.0)
+
+
+def semester_gpa(points_credits):
+    points = sum(points for points, _ in points_credits)
+    credits = sum(credits for _, credits in points_credits)
+    return round(points / credits, 2) if credits else None
+
+
+def standing_fields(results):
+    """results: (course_id, semester_year, semester_name, marks, credit_hours)"""
+    by_semester = defaultdict(list)
+    latest_attempt = {}
+
+    for course_id, semester_year, semester_name, marks, credit_hours in results:
+        semester = (semester_year, semester_name)
+        by_semester[semester].append((grade_point(marks) * credit_hours, credit_hours))
+        if course_id not in latest_attempt or semester >= latest_attempt[course_id][0]:
+            latest_attempt[course_id] = (semester, marks)
+
+    semesters = sorted(by_semester)
+    gpa = semester_gpa([pc for semester in semesters for pc in by_semester[semester]]) or 0.0
+    latest_gpa = semester_gpa(by_semester[semesters[-1]]) if semesters else None
+    previous_gpa = semester_gpa(by_semester[semesters[-2]]) if len(semesters) > 1 else None
+    gpa_drop = round(previous_gpa - latest_gpa, 2) if previous_gpa is not None else 0.0
+
+    latest_marks = [marks for _, marks in latest_attempt.values()]
+    repeat_count = sum(1 for marks in latest_marks if REPEAT_MARK <= marks < PASS_MARK)
+    unsupplementable_count = sum(1 for marks in latest_marks if marks < REPEAT_MARK)
+    low_gpa = bool(semesters) and gpa < AT_RISK_GPA
+
+    return {
+        "gpa": gpa,
+        "latest_gpa": latest_gpa,
+        "previous_gpa": previous_gpa,
+        "gpa_drop": gpa_drop,
+        "repeat_count": repeat_count,
+        "unsupplementable_count": unsupplementable_count,
+        "low_gpa": low_gpa,
+        "is_at_risk": (
+            low_gpa or repeat_count > 0 or unsupplementable_count > 0
+            or gpa_drop >= GPA_DROP_THRESHOLD
+        ),
+    }
+
+
+def backfill_standings(apps, schema_editor):
+    """
+    Every student gets a standing; the dashboards read only from this
+    table. 0008 calls this again for the students it copies.
+    """
+    # A replica gets the rows through replication
+    if schema_editor.connection.alias != DEFAULT_DB_ALIAS:
+        return
+
+    Student = apps.get_model("portal", "Student")
+    Result = apps.get_model("portal", "Result")
+    StudentStanding = apps.get_model("portal", "StudentStanding")
+
+    student_ids = list(Student.objects.values_list("id", flat=True).order_by("id"))
+
+    for start in range(0, len(student_ids), BATCH_SIZE):
+        batch = student_ids[start:start + BATCH_SIZE]
+
+        results = defaultdict(list)
+        for student_id, *row in Result.objects.filter(
+            student_id__in=batch, marks__isnull=False
+        ).values_list(
+            "student_id", "course_id", "semester__year", "semester__name", "marks", "course__credit_hours"
+        ).order_by():
+            results[student_id].append(row)
+
+        StudentStanding.objects.bulk_create(
+            [
+                StudentStanding(
+                    student_id=student_id, program=program, year=year,
+                    **standing_fields(results[student_id]),
+                )
+                for student_id, program, year in Student.objects.filter(
+                    id__in=batch
+                ).values_list("id", "program", "year")
+            ],
+            update_conflicts=True,
+            unique_fields=["student"],
+            update_fields=[
+                "program", "year", "gpa", "latest_gpa", "previous_gpa", "gpa_drop",
+                "repeat_count", "unsupplementable_count", "low_gpa", "is_at_risk", "updated_at",
+            ],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0006_resultrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentStanding',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='standing', serialize=False, to='portal.student')),
+                ('program', models.CharField(max_length=150)),
+                ('year', models.PositiveIntegerField()),
+                ('gpa', models.FloatField(default=0.0)),
+                ('latest_gpa', models.FloatField(blank=True, null=True)),
+                ('previous_gpa', models.FloatField(blank=True, null=True)),
+                ('gpa_drop', models.FloatField(default=0.0)),
+                ('repeat_count', models.PositiveIntegerField(default=0)),
+                ('unsupplementable_count', models.PositiveIntegerField(default=0)),
+                ('low_gpa', models.BooleanField(default=False)),
+                ('is_at_risk', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['is_at_risk', 'program', 'year', 'gpa'], name='portal_stud_is_at_r_eda805_idx'), models.Index(fields=['gpa'], name='portal_stud_gpa_3300a7_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_standings, migrations.RunPython.noop),
+    ]
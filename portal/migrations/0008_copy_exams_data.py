@@ -0,0 +1,28 @@
+from importlib import import_module
+
+from django.db import DEFAULT_DB_ALIAS, migrations
+
+from portal.legacy import copy_exams_data
+
+# Bulk inserts skip the result signals; recompute standings as 0007 does
+backfill_standings = import_module("portal.migrations.0007_studentstanding").backfill_standings
+
+
+def forwards(apps, schema_editor):
+    # A replica gets the rows through replication
+    if schema_editor.connection.alias != DEFAULT_DB_ALIAS:
+        return
+    copy_exams_data(apps)
+    backfill_standings(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0007_studentstanding'),
+        ('exams', '0002_course_credit_hours_alter_course_name_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.0.2 on 2026-10-19 12:06
+
+import datetime
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, migrations, models
+
+
+def index_staff_files(apps, schema_editor):
+    """
+    Files saved directly under MEDIA_ROOT/staff move into the store
+    (staff/<2 hex>/<sha256><ext>) and get a StaffFile row each, so the
+    listing shows them. Same steps as portal.filestore.store_path,
+    inlined so the migration does not depend on current app code.
+    """
+    # A replica gets the rows through replication
+    if schema_editor.connection.alias != DEFAULT_DB_ALIAS:
+        return
+
+    StaffFile = apps.get_model("portal", "StaffFile")
+    root = os.path.join(settings.MEDIA_ROOT, "staff")
+    if not os.path.isdir(root):
+        return
+
+    with os.scandir(root) as entries:
+        loose = sorted(entry.path for entry in entries if entry.is_file() and not entry.name.startswith("."))
+
+    for path in loose:
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as source:
+            for chunk in iter(lambda: source.read(64 * 1024), b""):
+                digest.update(chunk)
+                size += len(chunk)
+        sha256 = digest.hexdigest()
+
+        file_name = os.path.basename(path)
+        extension = os.path.splitext(file_name)[1].lower()
+        if not re.fullmatch(r"\.[a-z0-9]{1,10}", extension):
+            extension = ""
+
+        existing = StaffFile.objects.filter(sha256=sha256).values_list("path", flat=True).first()
+        relative_path = existing or f"staff/{sha256[:2]}/{sha256}{extension}"
+        full_path = os.path.join(settings.MEDIA_ROOT, relative_path)
+        modified = datetime.datetime.fromtimestamp(os.stat(path).st_mtime, tz=datetime.timezone.utc)
+
+        if os.path.exists(full_path):
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            shutil.move(path, full_path)
+
+        staff_file = StaffFile.objects.create(
+            file_name=file_name[:255],
+            path=relative_path,
+            sha256=sha256,
+            size=size,
+            content_type=mimetypes.guess_type(file_name)[0] or "application/octet-stream",
+        )
+        StaffFile.objects.filter(pk=staff_file.pk).update(created_at=modified)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0008_copy_exams_data'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaffFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('file_name', models.CharField(max_length=255)),
+                ('path', models.CharField(max_length=255)),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('size', models.PositiveBigIntegerField()),
+                ('content_type', models.CharField(max_length=100)),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='staff_files', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['-created_at'], name='portal_staf_created_22c979_idx')],
+            },
+        ),
+        migrations.RunPython(index_staff_files, migrations.RunPython.noop),
+    ]
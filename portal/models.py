@@ -4,11 +4,15 @@ Complete Academic Management System
 Production-Ready & Structure Preserved
 """
 
+import uuid
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
 
 
 # =====================================================
@@ -189,6 +193,17 @@ class Result(TimeStampedModel):
     def __str__(self):
         return f"{self.student.reg_number} - {self.course.code}"
 
+    # =================================================
+    # MARKS HISTORY (AUDIT LOG)
+    # =================================================
+    @property
+    def history(self):
+        return ResultChange.objects.filter(
+            student_id=self.student_id,
+            course_id=self.course_id,
+            semester_id=self.semester_id,
+        )
+
     # =================================================
     # GRADE POINT SYSTEM (SAFE)
     # =================================================
@@ -251,6 +266,327 @@ class Result(TimeStampedModel):
         return "PASS"
 
 
+# =====================================================
+# STUDENT STANDING (AT-RISK INDEX)
+# Kept up to date by portal.standing whenever a student's
+# results change, so reports never recompute every GPA.
+# =====================================================
+class StudentStanding(models.Model):
+
+    student = models.OneToOneField(
+        Student,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="standing"
+    )
+
+    # Copied from Student so reports filter on one indexed table
+    program = models.CharField(max_length=150)
+    year = models.PositiveIntegerField()
+
+    gpa = models.FloatField(default=0.0)
+    latest_gpa = models.FloatField(null=True, blank=True)
+    previous_gpa = models.FloatField(null=True, blank=True)
+    gpa_drop = models.FloatField(default=0.0)
+
+    # Courses whose latest attempt is REPEAT COURSE / UNSUPPLEMENTABLE FAIL
+    repeat_count = models.PositiveIntegerField(default=0)
+    unsupplementable_count = models.PositiveIntegerField(default=0)
+
+    low_gpa = models.BooleanField(default=False)
+    is_at_risk = models.BooleanField(default=False)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["is_at_risk", "program", "year", "gpa"]),
+            models.Index(fields=["gpa"]),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id}: GPA {self.gpa}"
+
+
+# =====================================================
+# RESULT ROLLUP (FACT TABLE FOR TRENDS & COHORTS)
+# One row per (program, year of study, semester, course),
+# rebuilt by `manage.py rollup_results`.
+# =====================================================
+class ResultRollup(models.Model):
+
+    program = models.CharField(max_length=150)
+    year = models.PositiveIntegerField()
+
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, related_name="+")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="+", db_index=False)
+
+    count = models.PositiveIntegerField()
+    marks_sum = models.FloatField()
+    marks_sum_squares = models.FloatField()
+    passed = models.PositiveIntegerField()
+    repeat = models.PositiveIntegerField()
+
+    # Counts per grade letter, in portal.analytics.GRADE_BANDS order
+    grade_counts = models.JSONField(default=list)
+
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["program", "year", "semester", "course"],
+                name="unique_result_rollup",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["course", "semester"]),
+        ]
+
+    def __str__(self):
+        return f"{self.program} Y{self.year} {self.semester_id}/{self.course_id}"
+
+
+# =====================================================
+# RESULT MARKS AUDIT LOG (APPEND-ONLY)
+# Keyed by (student, course, semester) rather than Result,
+# so history survives a result being deleted and re-entered.
+# =====================================================
+class ResultChange(models.Model):
+
+    FORM = "form"
+    CSV = "csv"
+    XLSX = "xlsx"
+    ADMIN = "admin"
+
+    SOURCE_CHOICES = [
+        (FORM, "Form"),
+        (CSV, "CSV import"),
+        (XLSX, "Excel import"),
+        (ADMIN, "Admin"),
+    ]
+
+    # The composite index below covers every lookup; no per-column indexes
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name="result_changes",
+        db_index=False
+    )
+
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="+", db_index=False)
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, related_name="+", db_index=False)
+
+    old_marks = models.FloatField(null=True, blank=True)
+    new_marks = models.FloatField(null=True, blank=True)
+
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+
+    changed_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        db_index=False
+    )
+
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["changed_at", "id"]
+        indexes = [
+            models.Index(fields=["student", "course", "semester"]),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id}/{self.course_id}/{self.semester_id}: {self.old_marks} -> {self.new_marks}"
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError("Result changes are append-only.")
+        super().save(*args, **kwargs)
+
+
+# =====================================================
+# STAGED RESULT IMPORT (UPLOAD PREVIEW)
+# =====================================================
+class ResultImport(TimeStampedModel):
+
+    STAGING = "staging"
+    STAGED = "staged"
+    COMMITTED = "committed"
+
+    STATUS_CHOICES = [
+        (STAGING, "Staging"),
+        (STAGED, "Staged"),
+        (COMMITTED, "Committed"),
+    ]
+
+    uploaded_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="result_imports"
+    )
+
+    file_name = models.CharField(max_length=255)
+    content_hash = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STAGED, db_index=True)
+
+    # Valid rows are StagedResultRows. Only the first
+    # importers.MAX_STORED_ERRORS messages are kept; error_count counts all.
+    errors = models.JSONField(default=list)
+    error_count = models.PositiveIntegerField(default=0)
+
+    insert_count = models.PositiveIntegerField(default=0)
+    update_count = models.PositiveIntegerField(default=0)
+    unchanged_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+
+    # Checkpoint: staged rows already written to Result
+    rows_applied = models.PositiveIntegerField(default=0)
+
+    committed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.file_name} ({self.status})"
+
+    @property
+    def row_count(self):
+        return self.insert_count + self.update_count + self.unchanged_count
+
+
+# One valid row of a staged import, compared with the result it replaces
+class StagedResultRow(models.Model):
+
+    INSERT = "insert"
+    UPDATE = "update"
+    UNCHANGED = "unchanged"
+
+    CHANGE_CHOICES = [
+        (INSERT, "Insert"),
+        (UPDATE, "Update"),
+        (UNCHANGED, "Unchanged"),
+    ]
+
+    result_import = models.ForeignKey(
+        ResultImport,
+        on_delete=models.CASCADE,
+        related_name="staged_rows",
+        db_index=False
+    )
+
+    # File line, for messages and for committing in file order
+    line = models.PositiveIntegerField()
+
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="+", db_index=False)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="+", db_index=False)
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, related_name="+", db_index=False)
+
+    marks = models.FloatField()
+    old_marks = models.FloatField(null=True, blank=True)
+    change = models.CharField(max_length=10, choices=CHANGE_CHOICES)
+
+    class Meta:
+        ordering = ["line"]
+        constraints = [
+            models.UniqueConstraint(fields=["result_import", "line"], name="unique_staged_row_line"),
+        ]
+        indexes = [
+            # Preview filters by change; duplicate detection groups by result key
+            models.Index(fields=["result_import", "change", "line"]),
+            models.Index(fields=["result_import", "student", "course", "semester", "line"]),
+        ]
+
+    def __str__(self):
+        return f"Row {self.line}: {self.student_id}/{self.course_id}/{self.semester_id} -> {self.marks}"
+
+
+# =====================================================
+# STAFF FILE STORE (portal/filestore.py)
+# =====================================================
+class StaffFile(TimeStampedModel):
+
+    uploaded_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="staff_files"
+    )
+
+    file_name = models.CharField(max_length=255)
+
+    # One row per upload. Relative to MEDIA_ROOT: uploads with the
+    # same content share the path, so each content is stored once.
+    path = models.CharField(max_length=255)
+    sha256 = models.CharField(max_length=64, db_index=True)
+
+    size = models.PositiveBigIntegerField()
+    content_type = models.CharField(max_length=100)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at"]),
+        ]
+
+    def __str__(self):
+        return self.file_name
+
+    @property
+    def url(self):
+        return f"{settings.MEDIA_URL}{self.path}"
+
+
+# =====================================================
+# CHUNKED, RESUMABLE UPLOAD (portal/uploads.py)
+# =====================================================
+class ChunkedUpload(TimeStampedModel):
+
+    RESULTS = "results"
+    STAFF_FILE = "staff_file"
+
+    PURPOSE_CHOICES = [
+        (RESULTS, "Results import"),
+        (STAFF_FILE, "Staff file"),
+    ]
+
+    OPEN = "open"
+    COMPLETE = "complete"
+
+    STATUS_CHOICES = [
+        (OPEN, "Open"),
+        (COMPLETE, "Complete"),
+    ]
+
+    # Unguessable: the id is the upload's URL
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    uploaded_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="chunked_uploads"
+    )
+
+    file_name = models.CharField(max_length=255)
+    purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=OPEN)
+
+    size = models.PositiveBigIntegerField()
+
+    # Bytes safely on disk; the next chunk must start here
+    received = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.file_name} ({self.received}/{self.size})"
+
+
 # =====================================================
 # AUTO CREATE STUDENT PROFILE
 # =====================================================
@@ -0,0 +1,148 @@
+"""
+portal/standing.py
+At-Risk Index (StudentStanding)
+
+Each student's standing (cumulative GPA, semester GPA drop, courses
+to repeat) is recomputed only when their own results change, or a
+course's credit hours or a semester's ordering that they depend on,
+from one query over just those students' results.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Course, Semester, Student, Result, StudentStanding
+
+
+AT_RISK_GPA = 1.5         # same threshold the staff dashboard used
+GPA_DROP_THRESHOLD = 0.5  # between the two most recent semesters
+REFRESH_BATCH = 1000
+
+PASS_MARK = 40
+REPEAT_MARK = 30
+
+
+def _gpa(points_credits):
+    points = sum(points for points, _ in points_credits)
+    credits = sum(credits for _, credits in points_credits)
+    return round(points / credits, 2) if credits else None
+
+
+def compute_standing(student_id, program, year, results):
+    """
+    results: (course_id, semester_year, semester_name, marks, credit_hours)
+    for one student, in any order.
+    """
+    by_semester = defaultdict(list)
+    latest_attempt = {}
+
+    for course_id, semester_year, semester_name, marks, credit_hours in results:
+        semester = (semester_year, semester_name)
+        grade_point = Result(marks=marks).grade_point
+        by_semester[semester].append((grade_point * credit_hours, credit_hours))
+
+        if course_id not in latest_attempt or semester >= latest_attempt[course_id][0]:
+            latest_attempt[course_id] = (semester, marks)
+
+    semesters = sorted(by_semester)
+    gpa = _gpa([pc for semester in semesters for pc in by_semester[semester]]) or 0.0
+    latest_gpa = _gpa(by_semester[semesters[-1]]) if semesters else None
+    previous_gpa = _gpa(by_semester[semesters[-2]]) if len(semesters) > 1 else None
+    gpa_drop = round(previous_gpa - latest_gpa, 2) if previous_gpa is not None else 0.0
+
+    latest_marks = [marks for _, marks in latest_attempt.values()]
+    repeat_count = sum(1 for marks in latest_marks if REPEAT_MARK <= marks < PASS_MARK)
+    unsupplementable_count = sum(1 for marks in latest_marks if marks < REPEAT_MARK)
+
+    low_gpa = bool(semesters) and gpa < AT_RISK_GPA
+
+    return StudentStanding(
+        student_id=student_id,
+        program=program,
+        year=year,
+        gpa=gpa,
+        latest_gpa=latest_gpa,
+        previous_gpa=previous_gpa,
+        gpa_drop=gpa_drop,
+        repeat_count=repeat_count,
+        unsupplementable_count=unsupplementable_count,
+        low_gpa=low_gpa,
+        is_at_risk=(
+            low_gpa
+            or repeat_count > 0
+            or unsupplementable_count > 0
+            or gpa_drop >= GPA_DROP_THRESHOLD
+        ),
+    )
+
+
+def refresh_standings(student_ids):
+    """Recompute and upsert the standing of these students only."""
+    student_ids = list(set(student_ids))
+
+    for start in range(0, len(student_ids), REFRESH_BATCH):
+        batch = student_ids[start:start + REFRESH_BATCH]
+
+        students = Student.objects.filter(id__in=batch).values_list("id", "program", "year")
+
+        results = defaultdict(list)
+        for student_id, *row in Result.objects.filter(
+            student_id__in=batch, marks__isnull=False
+        ).values_list(
+            "student_id", "course_id", "semester__year", "semester__name", "marks", "course__credit_hours"
+        ).order_by():
+            results[student_id].append(row)
+
+        standings = [
+            compute_standing(student_id, program, year, results[student_id])
+            for student_id, program, year in students
+        ]
+
+        StudentStanding.objects.bulk_create(
+            standings,
+            update_conflicts=True,
+            unique_fields=["student"],
+            update_fields=[
+                "program", "year", "gpa", "latest_gpa", "previous_gpa", "gpa_drop",
+                "repeat_count", "unsupplementable_count", "low_gpa", "is_at_risk", "updated_at",
+            ],
+        )
+
+
+def refresh_standings_on_commit(student_ids):
+    student_ids = set(student_ids)
+    if student_ids:
+        transaction.on_commit(lambda: refresh_standings(student_ids))
+
+
+# Bulk writes skip these signals; importers refresh explicitly
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def result_changed(sender, instance, **kwargs):
+    refresh_standings_on_commit([instance.student_id])
+
+
+@receiver(post_save, sender=Student)
+def student_changed(sender, instance, **kwargs):
+    refresh_standings_on_commit([instance.id])
+
+
+# Credit hours weight every GPA that includes the course
+@receiver(post_save, sender=Course)
+def course_changed(sender, instance, created, **kwargs):
+    if not created:
+        refresh_standings_on_commit(
+            Result.objects.filter(course_id=instance.id).values_list("student_id", flat=True)
+        )
+
+
+# A semester's year and name order it, which decides latest/previous GPA
+@receiver(post_save, sender=Semester)
+def semester_changed(sender, instance, created, **kwargs):
+    if not created:
+        refresh_standings_on_commit(
+            Result.objects.filter(semester_id=instance.id).values_list("student_id", flat=True)
+        )
@@ -0,0 +1,327 @@
+"""
+portal/tests.py
+Read-replica routing (router, read_replica()/replica_view and the
+pin-to-primary cookie), course statistics caching, the exams pages'
+semester results, result imports and the streamed exports.
+
+The replica tests need a second SQLite database with its own test
+database, so which one a query went to is visible from the rows it
+returns:
+
+    DATABASE_REPLICA_URL=sqlite:///replica.sqlite3 python manage.py test portal
+"""
+
+from io import BytesIO
+from unittest import mock, skipUnless
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from .analytics import cache_key, course_stats
+from .db_router import (
+    PIN_COOKIE,
+    REPLICA_DB,
+    ReplicaPinningMiddleware,
+    ReplicaRouter,
+    read_replica,
+    replica_configured,
+    replica_view,
+)
+from .gpa import semester_results
+from .importers import ResultImporter, commit_import, read_upload
+from .models import Course, Result, ResultChange, Semester
+
+
+needs_replica = skipUnless(replica_configured(), "DATABASE_REPLICA_URL is not set")
+
+# The test runner checks these even for skipped classes
+BOTH_DATABASES = {"default", REPLICA_DB} if replica_configured() else {"default"}
+
+
+def course_codes():
+    return list(Course.objects.values_list("code", flat=True))
+
+
+@needs_replica
+class ReplicaRouterTests(TestCase):
+    databases = BOTH_DATABASES
+
+    @classmethod
+    def setUpTestData(cls):
+        Course.objects.using("default").create(code="PRIMARY", name="On the primary", credit_hours=3)
+        Course.objects.using(REPLICA_DB).create(code="REPLICA", name="On the replica", credit_hours=3)
+
+    def test_reads_use_primary_by_default(self):
+        self.assertIsNone(ReplicaRouter().db_for_read(Course))
+        self.assertEqual(course_codes(), ["PRIMARY"])
+
+    def test_read_replica_sends_reads_to_replica(self):
+        with read_replica():
+            self.assertEqual(ReplicaRouter().db_for_read(Course), REPLICA_DB)
+            self.assertEqual(course_codes(), ["REPLICA"])
+
+        self.assertEqual(course_codes(), ["PRIMARY"])
+
+    def test_writes_always_use_primary(self):
+        with read_replica():
+            self.assertEqual(ReplicaRouter().db_for_write(Course), "default")
+            course = Course.objects.create(code="NEW", name="Written during a replica read", credit_hours=3)
+
+        self.assertEqual(course._state.db, "default")
+        self.assertEqual(course_codes(), ["NEW", "PRIMARY"])
+
+    def test_relations_allowed_across_primary_and_replica(self):
+        primary = Course.objects.using("default").get()
+        replica = Course.objects.using(REPLICA_DB).get()
+
+        self.assertTrue(ReplicaRouter().allow_relation(primary, replica))
+
+    def test_replica_view(self):
+        seen = []
+
+        @replica_view
+        def view(request):
+            seen.append(course_codes())
+            return HttpResponse()
+
+        view(RequestFactory().get("/"))
+
+        self.assertEqual(seen, [["REPLICA"]])
+        self.assertEqual(course_codes(), ["PRIMARY"])
+
+    def test_async_replica_view(self):
+        seen = []
+
+        @replica_view
+        async def view(request):
+            seen.append(Course.objects.db)
+            return HttpResponse()
+
+        async_to_sync(view)(RequestFactory().get("/"))
+
+        self.assertEqual(seen, [REPLICA_DB])
+
+
+@needs_replica
+@override_settings(DATABASE_REPLICA_PIN_SECONDS=10)
+class ReplicaPinningMiddlewareTests(TestCase):
+    databases = BOTH_DATABASES
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.seen = []
+
+        @replica_view
+        def view(request):
+            self.seen.append(Course.objects.db)
+            return HttpResponse()
+
+        self.middleware = ReplicaPinningMiddleware(view)
+
+    def test_write_sets_pin_cookie(self):
+        response = self.middleware(self.factory.post("/"))
+
+        cookie = response.cookies[PIN_COOKIE]
+        self.assertEqual(cookie["max-age"], 10)
+        self.assertTrue(cookie["httponly"])
+
+    def test_read_does_not_set_pin_cookie(self):
+        response = self.middleware(self.factory.get("/"))
+
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(self.seen, [REPLICA_DB])
+
+    def test_pinned_reads_use_primary(self):
+        request = self.factory.get("/")
+        request.COOKIES[PIN_COOKIE] = "1"
+
+        self.middleware(request)
+
+        self.assertEqual(self.seen, ["default"])
+
+    def test_pin_does_not_outlive_request(self):
+        request = self.factory.get("/")
+        request.COOKIES[PIN_COOKIE] = "1"
+        self.middleware(request)
+
+        self.middleware(self.factory.get("/"))
+
+        self.assertEqual(self.seen, ["default", REPLICA_DB])
+
+    def test_async_pinned_reads_use_primary(self):
+        @replica_view
+        async def view(request):
+            self.seen.append(Course.objects.db)
+            return HttpResponse()
+
+        middleware = ReplicaPinningMiddleware(view)
+
+        request = self.factory.get("/")
+        request.COOKIES[PIN_COOKIE] = "1"
+        async_to_sync(middleware)(request)
+        response = async_to_sync(middleware)(self.factory.post("/"))
+
+        self.assertEqual(self.seen, ["default", REPLICA_DB])
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+
+@mock.patch("portal.db_router.replica_configured", return_value=False)
+class NoReplicaTests(SimpleTestCase):
+
+    def test_router_falls_back_to_primary(self, configured):
+        with read_replica():
+            self.assertIsNone(ReplicaRouter().db_for_read(Course))
+
+    def test_no_pin_cookie_without_replica(self, configured):
+        middleware = ReplicaPinningMiddleware(lambda request: HttpResponse())
+
+        response = middleware(RequestFactory().post("/"))
+
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+class ResultsTemplateTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="staff", is_staff=True)
+        course = Course.objects.create(code="FOR101", name="Forestry I", credit_hours=3)
+        cls.semester = Semester.objects.create(name="Semester 1", year=2024)
+
+        def student(reg_number, program, year):
+            student = User.objects.create_user(username=reg_number, first_name=reg_number.title()).student
+            student.program, student.year = program, year
+            student.save()
+            return student
+
+        student("FOR2A", "Forestry", 2)
+        student("FOR3A", "Forestry", 3)
+        student("BIO2A", "Biology", 2)
+        Result.objects.create(student=student("BIO2B", "Biology", 2), course=course, semester=cls.semester, marks=71)
+
+    def url(self):
+        return f"/download-template/?course=FOR101&semester={self.semester.id}&program=forestry&year=2"
+
+    def assertRoster(self, content):
+        self.assertEqual(
+            [line.split(",")[:2] + line.split(",")[-1:] for line in content.decode().splitlines()[1:]],
+            [["BIO2B", "Bio2B", "71.0"], ["FOR2A", "For2A", ""]],
+        )
+
+    def test_csv_template(self):
+        self.client.force_login(self.staff)
+
+        response = self.client.get(self.url())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRoster(b"".join(response.streaming_content))
+
+    async def test_csv_template_under_asgi(self):
+        await self.async_client.aforce_login(self.staff)
+
+        response = await self.async_client.get(self.url())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRoster(b"".join([chunk async for chunk in response.streaming_content]))
+
+
+class CourseStatsCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.course = Course.objects.create(code="FOR101", name="Forestry I", credit_hours=3)
+        cls.semester = Semester.objects.create(name="Semester 1", year=2024)
+        cls.student = User.objects.create_user(username="FOR2A").student
+        Result.objects.create(student=cls.student, course=cls.course, semester=cls.semester, marks=60)
+
+    def setUp(self):
+        cache.clear()
+        course_stats(self.course.id)
+
+    def cached(self):
+        return cache.get(cache_key(self.course.id))
+
+    def test_result_change_invalidates_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Result.objects.filter(course=self.course).get().delete()
+            # Until the commit, readers would only re-cache the old rows
+            self.assertIsNotNone(self.cached())
+
+        self.assertIsNone(self.cached())
+
+    def test_course_rename_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.name = "Forest Ecology"
+            self.course.save()
+
+        self.assertIsNone(self.cached())
+        self.assertEqual(course_stats(self.course.id)[0]["course_name"], "Forest Ecology")
+
+    def test_semester_rename_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.semester.name = "Semester 2"
+            self.semester.save()
+
+        self.assertEqual(course_stats(self.course.id)[0]["semester"], "Semester 2 (2024)")
+
+
+class SemesterResultsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.semester = Semester.objects.create(name="Semester 1", year=2024)
+        cls.student = User.objects.create_user(username="FOR2A").student
+        cls.courses = [
+            Course.objects.create(code=f"FOR10{n}", name=f"Forestry {n}", credit_hours=3) for n in range(2)
+        ]
+
+    def classification(self, *marks):
+        for course, mark in zip(self.courses, marks):
+            Result.objects.create(student=self.student, course=course, semester=self.semester, marks=mark)
+        return semester_results("FOR2A", self.semester.id)["classification"]
+
+    def test_below_one_is_fail_on_the_exams_scale(self):
+        self.assertEqual(self.classification(45, 20), "Fail")
+
+    def test_one_to_one_and_a_half_is_pass(self):
+        self.assertEqual(self.classification(45, 45), "Pass")
+
+
+class ResultImportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="staff", is_staff=True)
+        Course.objects.create(code="FOR101", name="Forestry I", credit_hours=3)
+        cls.semester = Semester.objects.create(name="Semester 1", year=2024)
+        User.objects.create_user(username="FOR2A")
+
+    def commit(self, file_name, *marks):
+        lines = [f"FOR2A,FOR101,{self.semester.id},{mark}" for mark in marks or (64,)]
+        upload = BytesIO("\n".join(["reg_number,course_code,semester_id,marks", *lines]).encode())
+        # Rows are read as CSV either way; only the recorded file name differs
+        staged_import = ResultImporter().stage(read_upload(upload, "results.csv"), self.staff, file_name, file_name)
+        commit_import(staged_import, self.staff)
+        return staged_import
+
+    def test_csv_import_source(self):
+        self.commit("results.csv")
+
+        self.assertEqual(ResultChange.objects.get().source, ResultChange.CSV)
+
+    def test_xlsx_import_source(self):
+        self.commit("results.xlsx")
+        change = ResultChange.objects.get()
+
+        self.assertEqual(change.source, ResultChange.XLSX)
+        self.assertEqual(change.new_marks, 64)
+        self.assertEqual(change.changed_by, self.staff)
+
+    def test_last_duplicate_row_wins(self):
+        staged_import = self.commit("results.csv", 40, 55, 72)
+
+        self.assertEqual(Result.objects.get().marks, 72)
+        self.assertEqual((staged_import.insert_count, staged_import.error_count), (1, 0))
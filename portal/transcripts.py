@@ -0,0 +1,209 @@
+"""
+portal/transcripts.py
+Transcript PDF Rendering (ReportLab)
+
+Imported lazily by the transcript views so that management
+commands, tests and workers that never render a PDF do not
+pay for loading ReportLab.
+"""
+
+import threading
+from io import BytesIO
+
+from reportlab.platypus import BaseDocTemplate, PageTemplate, Frame, Image, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+
+
+PAGE_SIZE = letter
+MARGINS = {"rightMargin": 30, "leftMargin": 30, "topMargin": 60, "bottomMargin": 50}
+
+QR_SIZE = 90  # points
+
+# =====================================================
+# SHARED STYLES AND TABLE GEOMETRY
+# Styles are only read while a document is built, so one copy serves
+# every thread. Fixed column widths and row heights spare ReportLab
+# from measuring every cell of every transcript to size the table.
+# =====================================================
+STYLES = getSampleStyleSheet()
+
+TABLE_HEADER = ["Course", "Semester", "Marks", "Grade", "Credits"]
+
+TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.darkgreen),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
+])
+
+FRAME_WIDTH = PAGE_SIZE[0] - MARGINS["leftMargin"] - MARGINS["rightMargin"]
+FRAME_HEIGHT = PAGE_SIZE[1] - MARGINS["topMargin"] - MARGINS["bottomMargin"]
+
+# The course name takes whatever the other columns leave of the frame
+COLUMN_WIDTHS = [None, 100, 50, 50, 50]
+COLUMN_WIDTHS[0] = FRAME_WIDTH - sum(COLUMN_WIDTHS[1:])
+
+# One line of 10pt text plus padding; the header has extra bottom padding
+HEADER_HEIGHT = 23
+ROW_HEIGHT = 18
+
+
+class TranscriptRenderer:
+    """
+    Holds the page template and the header and signature flowables,
+    which are the same on every transcript, so each render only builds
+    the student-specific parts.
+
+    Flowables keep layout state while a document is built, so a renderer
+    must not be shared between threads; use get_renderer().
+    """
+
+    def __init__(self):
+        self.page_template = PageTemplate(
+            id="transcript",
+            frames=[
+                Frame(
+                    MARGINS["leftMargin"],
+                    MARGINS["bottomMargin"],
+                    FRAME_WIDTH,
+                    FRAME_HEIGHT,
+                    id="normal",
+                )
+            ],
+        )
+
+        # =====================================================
+        # INSTITUTIONAL HEADER
+        # =====================================================
+        self.header = [
+            Paragraph("<b>MAWLLOW COLLEGE OF FORESTRY & WILDLIFE</b>", STYLES["Title"]),
+            Paragraph("Academic Records Office", STYLES["Normal"]),
+            Paragraph("Official Transcript Document", STYLES["Normal"]),
+            Spacer(1, 20),
+        ]
+
+        # =====================================================
+        # DIGITAL SIGNATURE BLOCK
+        # =====================================================
+        self.signature = [
+            Spacer(1, 40),
+            Paragraph(
+                """
+                <b>______________________________</b><br/>
+                Registrar / Academic Officer<br/>
+                Official Digital Signature<br/>
+                """,
+                STYLES["Normal"]
+            ),
+        ]
+
+    def render(self, student, results, gpa, classification, verification_url=None):
+        """
+        Render the transcript to PDF bytes.
+        CPU-bound and ORM-free, so it is safe to run in a worker thread.
+        """
+
+        buffer = BytesIO()
+        document = BaseDocTemplate(
+            buffer,
+            pagesize=PAGE_SIZE,
+            pageTemplates=[self.page_template],
+            **MARGINS
+        )
+
+        elements = list(self.header)
+
+        # =====================================================
+        # STUDENT DETAILS
+        # =====================================================
+        student_info = f"""
+        <b>Name:</b> {student.user.get_full_name()}<br/>
+        <b>Registration Number:</b> {student.reg_number}<br/>
+        <b>Program:</b> {student.program}<br/>
+        <b>Year:</b> {student.year}
+        """
+
+        elements.append(Paragraph(student_info, STYLES["Normal"]))
+        elements.append(Spacer(1, 20))
+
+        # =====================================================
+        # RESULTS TABLE
+        # =====================================================
+        data = [TABLE_HEADER]
+
+        for result in results:
+            data.append([
+                result.course.name,
+                result.semester.name,
+                result.marks,
+                result.grade_letter,
+                result.course.credit_hours
+            ])
+
+        elements.append(Table(
+            data,
+            colWidths=COLUMN_WIDTHS,
+            rowHeights=[HEADER_HEIGHT] + [ROW_HEIGHT] * (len(data) - 1),
+            style=TABLE_STYLE,
+            repeatRows=1,
+        ))
+        elements.append(Spacer(1, 25))
+
+        # =====================================================
+        # GPA
+        # =====================================================
+        elements.append(
+            Paragraph(f"<b>Cumulative GPA:</b> {gpa}", STYLES["Heading2"])
+        )
+
+        elements.append(
+            Paragraph(f"<b>Academic Status:</b> {classification}", STYLES["Heading3"])
+        )
+
+        # =====================================================
+        # VERIFICATION QR CODE
+        # =====================================================
+        if verification_url:
+            elements.append(Spacer(1, 20))
+            elements.append(verification_qr(verification_url))
+            elements.append(
+                Paragraph(f"Verify this transcript: {verification_url}", STYLES["Normal"])
+            )
+
+        elements.extend(self.signature)
+
+        document.build(elements)
+
+        return buffer.getvalue()
+
+
+def verification_qr(url):
+    # Only transcripts load qrcode, so it is imported here
+    import qrcode
+
+    buffer = BytesIO()
+    qrcode.make(url, box_size=4, border=1).save(buffer, format="PNG")
+    buffer.seek(0)
+
+    return Image(buffer, width=QR_SIZE, height=QR_SIZE, hAlign="LEFT")
+
+
+_local = threading.local()
+
+
+def get_renderer():
+    """
+    One renderer per thread, built on first use.
+    """
+    renderer = getattr(_local, "renderer", None)
+    if renderer is None:
+        renderer = _local.renderer = TranscriptRenderer()
+    return renderer
+
+
+def build_transcript_pdf(student, results, gpa, classification, verification_url=None):
+    return get_renderer().render(student, results, gpa, classification, verification_url)
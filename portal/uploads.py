@@ -0,0 +1,202 @@
+"""
+portal/uploads.py
+Chunked, Resumable Uploads (staff)
+
+    POST /api/uploads/                 {"file_name", "size", "purpose"}  -> {"id", "offset"}
+    GET  /api/uploads/<id>/            -> {"offset"}   (where to resume)
+    PUT  /api/uploads/<id>/?offset=N   raw bytes of the next chunk -> {"offset"}
+    POST /api/uploads/<id>/finalize/   {"sha256"} -> what the file became
+
+Chunks are appended straight to a part file on disk; "received" only
+moves forward once a chunk is flushed, so after a failure the client
+asks for the offset and re-sends from there. Finalize checks the size
+and SHA-256, then hands the part file to the results importer or the
+staff file store without loading it into memory.
+"""
+
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .filestore import CHUNK_SIZE, hash_file, store_path
+from .importers import ResultImporter, UnreadableUpload, find_import, is_importable, read_upload
+from .models import ChunkedUpload, ResultImport
+
+
+# Uploads nobody finished are dropped after this long
+STALE_UPLOAD_TTL = timedelta(days=1)
+
+
+class UploadError(Exception):
+    """A request the upload cannot accept; the message is returned to the client."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def part_path(upload):
+    return os.path.join(settings.CHUNKED_UPLOAD_ROOT, f"{upload.pk}.part")
+
+
+def _discard(uploads):
+    for upload in uploads:
+        if os.path.exists(part_path(upload)):
+            os.remove(part_path(upload))
+        upload.delete()
+
+
+def start_upload(user, file_name, size, purpose):
+    if purpose not in dict(ChunkedUpload.PURPOSE_CHOICES):
+        raise UploadError(f"Unknown purpose '{purpose}'.")
+    if not file_name:
+        raise UploadError("file_name is required.")
+    if purpose == ChunkedUpload.RESULTS and not is_importable(file_name):
+        raise UploadError("Results uploads must be CSV or Excel (.xlsx) files.")
+    if not isinstance(size, int) or not 0 < size <= settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise UploadError(f"size must be between 1 and {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes.")
+
+    _discard(ChunkedUpload.objects.filter(
+        status=ChunkedUpload.OPEN,
+        updated_at__lt=timezone.now() - STALE_UPLOAD_TTL,
+    ))
+
+    upload = ChunkedUpload.objects.create(
+        uploaded_by=user,
+        file_name=os.path.basename(file_name)[:255],
+        purpose=purpose,
+        size=size,
+    )
+
+    os.makedirs(settings.CHUNKED_UPLOAD_ROOT, exist_ok=True)
+    open(part_path(upload), "wb").close()
+
+    return upload
+
+
+def write_chunk(upload_id, user, offset, stream):
+    """
+    Write one chunk read from stream (the request body) at offset, which
+    must equal the bytes already received. Returns the new offset.
+
+    No lock is held while the body arrives: the offset is checked up
+    front, and "received" only moves if nobody else moved it meanwhile.
+    """
+    upload = _open_upload(upload_id, user)
+
+    if offset != upload.received:
+        raise UploadError(f"Expected offset {upload.received}.", status=409)
+
+    limit = min(settings.CHUNKED_UPLOAD_MAX_CHUNK, upload.size - offset)
+    written = 0
+
+    with open(part_path(upload), "r+b") as part:
+        part.seek(offset)
+        while True:
+            data = stream.read(CHUNK_SIZE)
+            if not data:
+                break
+            written += len(data)
+            if written > limit:
+                raise UploadError(f"Chunk larger than {limit} bytes.", status=413)
+            part.write(data)
+
+        # Drop bytes left by an earlier attempt that never completed
+        part.truncate()
+        part.flush()
+        os.fsync(part.fileno())
+
+    # A racing write of the same offset, or a finalize, got there first;
+    # if its bytes were overwritten the checksum at finalize catches it
+    moved = ChunkedUpload.objects.filter(
+        pk=upload.pk, status=ChunkedUpload.OPEN, received=offset
+    ).update(received=offset + written, updated_at=timezone.now())
+    if not moved:
+        raise UploadError("Upload changed while the chunk was written; ask for the offset.", status=409)
+
+    return offset + written
+
+
+def finalize(upload_id, user, sha256):
+    """
+    Check the assembled file and hand it over. Returns a dict describing
+    the result for the client. The upload is closed either way; after a
+    failed check the client starts a new one.
+    """
+    with transaction.atomic():
+        upload = _open_upload(upload_id, user, lock=True)
+
+        if upload.received != upload.size:
+            raise UploadError(f"Received {upload.received} of {upload.size} bytes.", status=409)
+
+        # Claim it: later chunks and a second finalize are refused
+        upload.status = ChunkedUpload.COMPLETE
+        upload.save(update_fields=["status", "updated_at"])
+
+    path = part_path(upload)
+    try:
+        digest, size = hash_file(path)
+        if digest != (sha256 or "").lower():
+            raise UploadError("Checksum mismatch; start the upload again.", status=422)
+
+        if upload.purpose == ChunkedUpload.STAFF_FILE:
+            return _to_file_store(upload, path, size, digest)
+
+        try:
+            return _to_importer(upload, path, digest)
+        except UnreadableUpload as e:
+            raise UploadError(str(e), status=422)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _open_upload(upload_id, user, lock=False):
+    uploads = ChunkedUpload.objects.filter(pk=upload_id, uploaded_by=user)
+    if lock:
+        uploads = uploads.select_for_update()
+
+    upload = uploads.first()
+    if upload is None:
+        raise UploadError("Unknown upload.", status=404)
+    if upload.status != ChunkedUpload.OPEN:
+        raise UploadError("Upload already finalized.", status=409)
+    return upload
+
+
+def upload_offset(upload_id, user):
+    return _open_upload(upload_id, user).received
+
+
+def _to_file_store(upload, path, size, digest):
+    staff_file, stored = store_path(path, upload.file_name, size, digest, upload.uploaded_by)
+    return {
+        "purpose": upload.purpose,
+        "stored": stored,
+        "file_name": staff_file.file_name,
+        "url": staff_file.url,
+        "sha256": staff_file.sha256,
+    }
+
+
+def _to_importer(upload, path, digest):
+    staged_import = find_import(digest)
+
+    if staged_import is None:
+        with open(path, "rb") as source:
+            staged_import = ResultImporter().stage(
+                read_upload(source, upload.file_name), upload.uploaded_by, upload.file_name, digest
+            )
+
+    return {
+        "purpose": upload.purpose,
+        "import_id": staged_import.pk,
+        "already_committed": staged_import.status == ResultImport.COMMITTED,
+        "insert_count": staged_import.insert_count,
+        "update_count": staged_import.update_count,
+        "unchanged_count": staged_import.unchanged_count,
+        "error_count": staged_import.error_count,
+    }
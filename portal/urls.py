@@ -62,13 +62,29 @@ urlpatterns = [
     # =====================================================
     path("staff/add-result/", views.add_result, name="add_result"),
     path("upload-results/", views.upload_results, name="upload_results"),
+    path("upload-results/<int:pk>/preview/", views.upload_preview, name="upload_preview"),
+    path("upload-results/<int:pk>/commit/", views.upload_commit, name="upload_commit"),
+    path("api/uploads/", views.chunked_upload_start, name="chunked_upload_start"),
+    path("api/uploads/<uuid:upload_id>/", views.chunked_upload, name="chunked_upload"),
+    path("api/uploads/<uuid:upload_id>/finalize/", views.chunked_upload_finalize, name="chunked_upload_finalize"),
     path("download-template/", views.download_results_template, name="download_results_template"),
+    path("results/export/", views.export_results, name="export_results"),
+
+    # =====================================================
+    # ANALYTICS (STAFF ONLY)
+    # =====================================================
+    path("analytics/courses/", views.course_analytics, name="course_analytics"),
+    path("api/analytics/courses/", views.course_analytics_api, name="course_analytics_api"),
+    path("analytics/trends/", views.cohort_trends, name="cohort_trends"),
+    path("analytics/at-risk/", views.at_risk_report, name="at_risk_report"),
 
     # =====================================================
     # TRANSCRIPTS
     # =====================================================
     path("transcript/", views.transcript, name="transcript"),
     path("transcript/pdf/", views.export_transcript_pdf, name="export_transcript_pdf"),
+    path("verify/<str:token>/", views.verify_transcript, name="verify_transcript"),
+    path("api/verify/", views.verify_transcripts_api, name="verify_transcripts_api"),
 
 # =====================================================
 # SMART DASHBOARD
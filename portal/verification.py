@@ -0,0 +1,89 @@
+"""
+portal/verification.py
+Transcript Verification Tokens
+
+A token is the transcript's reg number, GPA and classification as
+printed, signed with HMAC (django.core.signing, keyed by SECRET_KEY)
+and timestamped at issue. Verifying one needs only the signature check
+and one indexed lookup by reg number; GPA is never recomputed.
+"""
+
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+from .models import Student
+
+
+SALT = "portal.transcript-verification"
+
+
+def make_token(student, gpa, classification):
+    return signing.dumps(
+        {"r": student.reg_number, "g": gpa, "c": classification},
+        salt=SALT,
+        compress=True,
+    )
+
+
+def read_token(token):
+    """The signed transcript details, or None if the token was tampered with."""
+    try:
+        payload = signing.loads(token, salt=SALT)
+    except signing.BadSignature:
+        return None
+
+    # dumps() signs with TimestampSigner: "<payload>:<timestamp>:<signature>"
+    timestamp = token.rsplit(":", 2)[1]
+
+    return {
+        "reg_number": payload["r"],
+        "gpa": payload["g"],
+        "classification": payload["c"],
+        "issued_at": datetime.fromtimestamp(signing.b62_decode(timestamp), tz=dt_timezone.utc),
+    }
+
+
+def students_by_reg_number(reg_numbers):
+    """Students with user and current standing, in one indexed IN query."""
+    return {
+        student.reg_number: student
+        for student in Student.objects.select_related("user", "standing").filter(
+            reg_number__in=reg_numbers
+        )
+    }
+
+
+# =====================================================
+# RATE LIMITING (BULK API)
+# A fixed-window counter per client in the configured cache.
+# =====================================================
+RATE_WINDOW_SECONDS = 60
+
+
+def client_id(request):
+    # The proxy in front of the app appends the real client address last;
+    # earlier entries are client-supplied and cannot be trusted.
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+    if forwarded:
+        return forwarded.split(",")[-1].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def rate_limited(client):
+    """Count one request for this client; True once it is over the limit."""
+    window = int(time.time() // RATE_WINDOW_SECONDS)
+    key = f"portal:verify-rate:{client}:{window}"
+
+    cache.add(key, 0, RATE_WINDOW_SECONDS)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, 1, RATE_WINDOW_SECONDS)
+        count = 1
+
+    return count > settings.VERIFY_RATE_LIMIT
@@ -4,27 +4,76 @@ Complete Consolidated Enterprise Academic System
 Enhanced • Secure • Role-Based • Production Ready
 """
 
-from io import BytesIO
 import csv
+import functools
+import json
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User, Group
 from django.contrib import messages
 from .forms import CourseForm
-from django.views.decorators.http import require_POST
-from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods, require_POST
+from django.http import HttpResponse, JsonResponse
 from django.db import transaction
+from django.db.models import Q
 from django.core.paginator import Paginator
-
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-
-from .models import Student, Staff, Course, Semester, Result
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.cache import cache_page
+
+from .models import (
+    Student,
+    Staff,
+    Course,
+    Semester,
+    Result,
+    ResultChange,
+    ResultImport,
+    ResultRollup,
+    StudentStanding,
+)
+from .analytics import GRADE_BANDS, cohort_comparison, course_stats, semester_trend
+from .db_router import replica_view
+from .gpa import calculate_gpa, classify_gpa
+from .importers import (
+    INSERT,
+    UPDATE,
+    UNCHANGED,
+    ResultImporter,
+    UnreadableUpload,
+    commit_import,
+    content_hash,
+    find_import,
+    is_importable,
+    read_upload,
+    reported_errors,
+)
+from .standing import AT_RISK_GPA, GPA_DROP_THRESHOLD
+from .uploads import UploadError, finalize, start_upload, upload_offset, write_chunk
+from .verification import (
+    RATE_WINDOW_SECONDS,
+    client_id,
+    make_token,
+    rate_limited,
+    read_token,
+    students_by_reg_number,
+)
+from .exports import (
+    TEMPLATE_HEADER,
+    filter_results,
+    export_response,
+    streaming_export,
+    template_roster,
+    template_rows,
+    atemplate_rows,
+)
 
 # =====================================================
 # ROLE HELPERS
@@ -36,37 +85,33 @@ def is_student(user):
 def is_staff_member(user):
     return user.is_authenticated and hasattr(user, "staff")
 
-# =====================================================
-# GPA CALCULATION
-# =====================================================
 
-def calculate_gpa(results):
-    total_points = 0
-    total_credits = 0
+# Async views cannot touch the lazy request.user, so these
+# resolve the user and role profiles with the async ORM.
+
+def alogin_required(view):
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await request.auser()
+        request.user = user
+
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
 
-    for result in results:
-        total_points += result.grade_point * result.course.credit_hours
-        total_credits += result.course.credit_hours
+        return await view(request, *args, **kwargs)
 
-    if total_credits == 0:
-        return 0.0
+    return wrapper
 
-    return round(total_points / total_credits, 2)
 
+async def aget_student(user):
+    return await Student.objects.select_related("user").filter(user=user).afirst()
 
-def classify_gpa(gpa):
-    if gpa < 1.0:
-        return "Withdraw"
-    elif gpa >= 3.5:
-        return "Distinction"
-    elif gpa >= 3.0:
-        return "Upper Credit"
-    elif gpa >= 2.5:
-        return "Lower Credit"
-    elif gpa >= 1.5:
-        return "Average"
-    return "Pass"
 
+def _page(queryset, per_page, page_number):
+    page = Paginator(queryset, per_page).get_page(page_number)
+    page.object_list = list(page.object_list)
+    return page
 
 # =====================================================
 # HOME
@@ -156,15 +201,19 @@ def smart_dashboard(request):
 # STUDENT DASHBOARD
 # =====================================================
 
-@login_required
-def student_dashboard(request):
+@alogin_required
+async def student_dashboard(request):
+
+    student = await aget_student(request.user)
 
-    if not is_student(request.user):
+    if student is None:
         messages.error(request, "Access denied.")
         return redirect("portal:home")
 
-    student = request.user.student
-    results = student.results.select_related("semester", "course")
+    results = [
+        result async for result in
+        student.results.select_related("semester", "course")
+    ]
 
     cumulative_gpa = calculate_gpa(results)
     academic_status = classify_gpa(cumulative_gpa)
@@ -178,134 +227,26 @@ def student_dashboard(request):
 # =====================================================
 # STAFF DASHBOARD
 # =====================================================
-@login_required
-def staff_dashboard(request):
+@alogin_required
+@replica_view
+async def staff_dashboard(request):
+
+    user = request.user
 
     # 🔒 STRICT ACCESS CONTROL
-    is_staff_profile = hasattr(request.user, "staff")
-    is_group_staff = request.user.groups.filter(name="Staff").exists()
-    is_superuser = request.user.is_superuser
+    is_staff_profile = await Staff.objects.filter(user=user).aexists()
+    is_group_staff = await user.groups.filter(name="Staff").aexists()
+    is_superuser = user.is_superuser
 
     if not (is_staff_profile or is_group_staff or is_superuser):
         messages.error(request, "Access denied.")
         return redirect("portal:home")
 
-    # ==========================
-    # SYSTEM STATISTICS
-    # ==========================
-    total_students = Student.objects.count()
-    total_courses = Course.objects.count()
-    total_semesters = Semester.objects.count()
-    total_results = Result.objects.count()
-
-    # ==========================
-    # PAGINATED RECENT STUDENTS
-    # ==========================
-    students_queryset = Student.objects.order_by("-id")
-
-    students_paginator = Paginator(students_queryset, 10)  # 10 per page
-    student_page_number = request.GET.get("student_page")
-    latest_students = students_paginator.get_page(student_page_number)
-
-    # ==========================
-    # PAGINATED RECENT RESULTS
-    # ==========================
-    results_queryset = Result.objects.select_related(
-        "student", "course", "semester"
-    ).order_by("-id")
-
-    results_paginator = Paginator(results_queryset, 10)
-    results_page_number = request.GET.get("results_page")
-    recent_results = results_paginator.get_page(results_page_number)
-
-    # ==========================
-    # GPA ANALYTICS
-    # ==========================
-    student_gpa_data = []
-
-    students = Student.objects.prefetch_related("results__course")
-
-    for student in students:
-
-        results = student.results.all()
-
-        total_points = 0
-        total_credits = 0
-
-        for result in results:
-            total_points += result.grade_point * result.course.credit_hours
-            total_credits += result.course.credit_hours
-
-        gpa = round(total_points / total_credits, 2) if total_credits > 0 else 0.0
-
-        student_gpa_data.append({
-            "student": student,
-            "gpa": gpa
-        })
-
-    top_students = sorted(
-        student_gpa_data,
-        key=lambda x: x["gpa"],
-        reverse=True
-    )[:5]
-
-    at_risk_students = [
-        s for s in student_gpa_data if s["gpa"] < 1.5
-    ]
-
-    # ==========================
-    # COURSE PERFORMANCE
-    # ==========================
-    course_stats = []
-
-    for course in Course.objects.all():
-
-        results = Result.objects.filter(course=course)
-        count = results.count()
-
-        if count > 0:
-            avg_mark = round(
-                sum(r.marks for r in results) / count,
-                2
-            )
-        else:
-            avg_mark = 0
-
-        course_stats.append({
-            "course": course,
-            "average_mark": avg_mark,
-            "total_students": count
-        })
-
-    # ==========================
-    # GPA DISTRIBUTION
-    # ==========================
-    distinction_count = len([s for s in student_gpa_data if s["gpa"] >= 3.5])
-    upper_count = len([s for s in student_gpa_data if 3.0 <= s["gpa"] < 3.5])
-    lower_count = len([s for s in student_gpa_data if 2.5 <= s["gpa"] < 3.0])
-    average_count = len([s for s in student_gpa_data if 1.5 <= s["gpa"] < 2.5])
-    fail_count = len([s for s in student_gpa_data if s["gpa"] < 1.5])
+    # The template shows only the at-risk count; everything else is a link
+    at_risk_count = await StudentStanding.objects.filter(low_gpa=True).acount()
 
     return render(request, "portal/staff_dashboard.html", {
-
-        "total_students": total_students,
-        "total_courses": total_courses,
-        "total_semesters": total_semesters,
-        "total_results": total_results,
-
-        # Now paginated
-        "students": latest_students,
-        "recent_results": recent_results,
-
-        "top_students": top_students,
-        "at_risk_students": at_risk_students,
-        "course_stats": course_stats,
-
-        "distinction_count": distinction_count,
-        "upper_count": upper_count,
-        "lower_count": lower_count,
-        "average_count": average_count,
-        "fail_count": fail_count,
+        "at_risk_count": at_risk_count,
     })
 # =====================================================
 # ADD RESULT (STAFF ONLY)
@@ -325,12 +266,28 @@ def add_result(request):
         course = get_object_or_404(Course, id=course_id)
         semester = get_object_or_404(Semester, id=semester_id)
 
-        Result.objects.update_or_create(
-            student=student,
-            course=course,
-            semester=semester,
-            defaults={"marks": float(marks)}
-        )
+        with transaction.atomic():
+            old_marks = Result.objects.filter(
+                student=student, course=course, semester=semester
+            ).values_list("marks", flat=True).first()
+
+            result, created = Result.objects.update_or_create(
+                student=student,
+                course=course,
+                semester=semester,
+                defaults={"marks": float(marks)}
+            )
+
+            if created or result.marks != old_marks:
+                ResultChange.objects.create(
+                    student=student,
+                    course=course,
+                    semester=semester,
+                    old_marks=None if created else old_marks,
+                    new_marks=result.marks,
+                    source=ResultChange.FORM,
+                    changed_by=request.user,
+                )
 
         messages.success(request, "Result saved successfully.")
         return redirect("portal:staff_dashboard")
@@ -352,56 +309,205 @@ def upload_results(request):
 
         csv_file = request.FILES.get("file")
 
-        if not csv_file or not csv_file.name.endswith(".csv"):
-            messages.error(request, "Please upload a valid CSV file.")
+        if not csv_file or not is_importable(csv_file.name):
+            messages.error(request, "Please upload a CSV or Excel (.xlsx) file.")
             return redirect("portal:upload_results")
 
-        decoded_file = csv_file.read().decode("utf-8").splitlines()
-        reader = csv.DictReader(decoded_file)
+        digest = content_hash(csv_file.chunks())
 
-        success_count = 0
-        error_count = 0
+        # Same file as an earlier upload: skip it if applied, reuse its staged rows otherwise
+        staged_import = find_import(digest)
 
-        for row in reader:
-            try:
-                student = Student.objects.get(reg_number=row["reg_number"])
-                course = Course.objects.get(name=row["course"])
-                semester = Semester.objects.get(name=row["semester"])
+        if staged_import is not None and staged_import.status == ResultImport.COMMITTED:
+            messages.info(
+                request,
+                f"This file was already imported on {staged_import.committed_at:%Y-%m-%d %H:%M}. "
+                "Nothing was changed."
+            )
+            return redirect("portal:staff_dashboard")
 
-                Result.objects.update_or_create(
-                    student=student,
-                    course=course,
-                    semester=semester,
-                    defaults={"marks": float(row["marks"])}
+        if staged_import is None:
+            try:
+                staged_import = ResultImporter().stage(
+                    read_upload(csv_file, csv_file.name), request.user, csv_file.name, digest
                 )
+            except UnreadableUpload as e:
+                messages.error(request, str(e))
+                return redirect("portal:upload_results")
+
+        # Preview: nothing is written yet
+        if request.POST.get("action") == "preview":
+            return redirect("portal:upload_preview", pk=staged_import.pk)
+
+        return _commit_upload(request, staged_import)
+
+    return render(request, "portal/upload_results.html", {
+        "courses": Course.objects.all(),
+        "semesters": Semester.objects.all(),
+    })
 
-                success_count += 1
 
-            except Exception:
-                error_count += 1
-                continue
+PREVIEW_FILTERS = {
+    "changes": (INSERT, UPDATE),
+    "inserts": (INSERT,),
+    "updates": (UPDATE,),
+    "unchanged": (UNCHANGED,),
+}
 
-        messages.success(
-            request,
-            f"Upload completed. Success: {success_count}, Errors: {error_count}"
+
+@staff_member_required
+def upload_preview(request, pk):
+
+    staged_import = get_object_or_404(ResultImport, pk=pk)
+
+    show = request.GET.get("show", "changes")
+
+    if show == "errors":
+        page = _page(staged_import.errors, 50, request.GET.get("page"))
+    else:
+        changes = PREVIEW_FILTERS.get(show, PREVIEW_FILTERS["changes"])
+        rows = staged_import.staged_rows.filter(change__in=changes).select_related(
+            "student", "course", "semester"
         )
+        page = _page(rows, 50, request.GET.get("page"))
+
+    return render(request, "portal/upload_preview.html", {
+        "staged_import": staged_import,
+        "page": page,
+        "show": show,
+    })
+
+
+def _commit_upload(request, staged_import):
+
+    resumed_from = staged_import.rows_applied
+
+    counts = commit_import(staged_import, request.user)
+
+    if counts is None:
+        messages.error(request, "This upload has already been committed.")
+        return redirect("portal:upload_preview", pk=staged_import.pk)
+
+    if resumed_from:
+        messages.info(request, f"Resumed an interrupted import after {resumed_from} rows.")
+
+    messages.success(
+        request,
+        f"Upload completed. New: {counts[INSERT]}, Updated: {counts[UPDATE]}, "
+        f"Unchanged: {counts[UNCHANGED]}, Errors: {staged_import.error_count}, "
+        f"Skipped (no marks): {staged_import.skipped_count}"
+    )
+    for error in reported_errors(staged_import.errors, staged_import.error_count):
+        messages.warning(request, error)
+
+    return redirect("portal:staff_dashboard")
+
+
+@staff_member_required
+@require_POST
+def upload_commit(request, pk):
+
+    staged_import = get_object_or_404(ResultImport, pk=pk)
+
+    return _commit_upload(request, staged_import)
+
+
+# =====================================================
+# CHUNKED, RESUMABLE UPLOADS (API, STAFF ONLY)
+# Protocol in portal/uploads.py
+# =====================================================
+
+def _json_body(request):
+    try:
+        body = json.loads(request.body)
+    except ValueError:
+        return None
+    return body if isinstance(body, dict) else None
+
+
+@staff_member_required
+@require_POST
+def chunked_upload_start(request):
+
+    body = _json_body(request)
+    if body is None:
+        return JsonResponse({"error": "Body must be a JSON object."}, status=400)
+
+    try:
+        upload = start_upload(
+            request.user,
+            str(body.get("file_name") or ""),
+            body.get("size"),
+            body.get("purpose"),
+        )
+    except UploadError as e:
+        return JsonResponse({"error": str(e)}, status=e.status)
+
+    return JsonResponse({
+        "id": str(upload.pk),
+        "offset": 0,
+        "max_chunk": settings.CHUNKED_UPLOAD_MAX_CHUNK,
+    }, status=201)
+
+
+@staff_member_required
+@require_http_methods(["GET", "PUT"])
+def chunked_upload(request, upload_id):
+
+    try:
+        if request.method == "PUT":
+            offset = request.GET.get("offset", "")
+            if not offset.isdigit():
+                return JsonResponse({"error": "offset is required."}, status=400)
+
+            # The request is read as a stream, never as request.body
+            received = write_chunk(upload_id, request.user, int(offset), request)
+        else:
+            received = upload_offset(upload_id, request.user)
+    except UploadError as e:
+        return JsonResponse({"error": str(e)}, status=e.status)
+
+    return JsonResponse({"offset": received})
+
+
+@staff_member_required
+@require_POST
+def chunked_upload_finalize(request, upload_id):
+
+    body = _json_body(request)
+    if body is None:
+        return JsonResponse({"error": "Body must be a JSON object."}, status=400)
+
+    try:
+        result = finalize(upload_id, request.user, str(body.get("sha256") or ""))
+    except UploadError as e:
+        return JsonResponse({"error": str(e)}, status=e.status)
+
+    if "import_id" in result:
+        result["preview_url"] = reverse("portal:upload_preview", args=[result["import_id"]])
+        result["commit_url"] = reverse("portal:upload_commit", args=[result["import_id"]])
+
+    return JsonResponse(result)
 
-        return redirect("portal:staff_dashboard")
 
-    return render(request, "portal/upload_results.html")
 # =====================================================
 # TRANSCRIPT
 # =====================================================
 
-@login_required
-def transcript(request):
+@alogin_required
+@replica_view
+async def transcript(request):
+
+    student = await aget_student(request.user)
 
-    if not is_student(request.user):
+    if student is None:
         messages.error(request, "Access denied.")
         return redirect("portal:home")
 
-    student = request.user.student
-    results = student.results.select_related("semester", "course")
+    results = [
+        result async for result in
+        student.results.select_related("semester", "course")
+    ]
 
     gpa = calculate_gpa(results)
 
@@ -416,136 +522,168 @@ def transcript(request):
 # =====================================================
 # EXPORT TRANSCRIPT PDF
 # =====================================================
-@login_required
-def export_transcript_pdf(request):
+@alogin_required
+@replica_view
+async def export_transcript_pdf(request):
 
-    if not is_student(request.user):
+    student = await aget_student(request.user)
+
+    if student is None:
         messages.error(request, "Access denied.")
         return redirect("portal:home")
 
-    student = request.user.student
-    results = student.results.select_related("semester", "course")
-
-    buffer = BytesIO()
-    document = SimpleDocTemplate(
-        buffer,
-        pagesize=letter,
-        rightMargin=30,
-        leftMargin=30,
-        topMargin=60,
-        bottomMargin=50
-    )
+    results = [
+        result async for result in
+        student.results.select_related("semester", "course")
+    ]
+
+    gpa = calculate_gpa(results)
+    classification = classify_gpa(gpa)
 
-    elements = []
-    styles = getSampleStyleSheet()
+    # ReportLab is imported on first use, not when the URLconf loads
+    from .transcripts import build_transcript_pdf
 
-    # =====================================================
-    # INSTITUTIONAL HEADER
-    # =====================================================
-    elements.append(
-        Paragraph(
-            "<b>MAWLLOW COLLEGE OF FORESTRY & WILDLIFE</b>",
-            styles["Title"]
-        )
+    token = make_token(student, gpa, classification)
+    verification_url = request.build_absolute_uri(
+        reverse("portal:verify_transcript", args=[token])
     )
 
-    elements.append(
-        Paragraph(
-            "Academic Records Office",
-            styles["Normal"]
-        )
+    # Keep the event loop free while ReportLab renders
+    pdf = await sync_to_async(build_transcript_pdf, thread_sensitive=False)(
+        student, results, gpa, classification, verification_url
     )
 
-    elements.append(
-        Paragraph(
-            "Official Transcript Document",
-            styles["Normal"]
-        )
+    response = HttpResponse(pdf, content_type="application/pdf")
+    response["Content-Disposition"] = (
+        f'attachment; filename="Transcript_{student.reg_number}.pdf"'
     )
 
-    elements.append(Spacer(1, 20))
+    return response
+# =====================================================
+# TRANSCRIPT VERIFICATION (PUBLIC)
+# =====================================================
 
-    # =====================================================
-    # STUDENT DETAILS
-    # =====================================================
-    student_info = f"""
-    <b>Name:</b> {student.user.get_full_name()}<br/>
-    <b>Registration Number:</b> {student.reg_number}<br/>
-    <b>Program:</b> {student.program}<br/>
-    <b>Year:</b> {student.year}
-    """
+VERIFY_CACHE_SECONDS = 300
 
-    elements.append(Paragraph(student_info, styles["Normal"]))
-    elements.append(Spacer(1, 20))
 
-    # =====================================================
-    # RESULTS TABLE
-    # =====================================================
-    data = [["Course", "Semester", "Marks", "Grade", "Credits"]]
-
-    for result in results:
-        data.append([
-            result.course.name,
-            result.semester.name,
-            result.marks,
-            result.grade_letter,
-            result.course.credit_hours
-        ])
-
-    table = Table(data, repeatRows=1)
-
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.darkgreen),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-    ]))
-
-    elements.append(table)
-    elements.append(Spacer(1, 25))
+@cache_page(VERIFY_CACHE_SECONDS)
+@replica_view
+def verify_transcript(request, token):
 
-    # =====================================================
-    # GPA
-    # =====================================================
-    gpa = calculate_gpa(results)
-    classification = classify_gpa(gpa)
+    issued = read_token(token)
+    student = None
 
-    elements.append(
-        Paragraph(f"<b>Cumulative GPA:</b> {gpa}", styles["Heading2"])
-    )
+    if issued is not None:
+        student = students_by_reg_number([issued["reg_number"]]).get(issued["reg_number"])
 
-    elements.append(
-        Paragraph(f"<b>Academic Status:</b> {classification}", styles["Heading3"])
-    )
+    standing = getattr(student, "standing", None) if student else None
 
-    elements.append(Spacer(1, 40))
+    return render(request, "portal/verify.html", {
+        "student": student,
+        "issued": issued,
+        "current_gpa": standing.gpa if standing else None,
+        "now": timezone.now(),
+    }, status=200 if student else 404)
 
-    # =====================================================
-    # DIGITAL SIGNATURE BLOCK
-    # =====================================================
-    signature_block = """
-    <b>______________________________</b><br/>
-    Registrar / Academic Officer<br/>
-    Official Digital Signature<br/>
+
+def _verified_transcript(token, issued, student):
+
+    if issued is None:
+        return {"token": token, "valid": False, "error": "Invalid signature."}
+
+    if student is None:
+        return {"token": token, "valid": False, "error": "Student not found."}
+
+    standing = getattr(student, "standing", None)
+
+    return {
+        "token": token,
+        "valid": True,
+        "reg_number": student.reg_number,
+        "name": student.user.get_full_name(),
+        "program": student.program,
+        "issued_gpa": issued["gpa"],
+        "issued_classification": issued["classification"],
+        "issued_at": issued["issued_at"].isoformat(),
+        "current_gpa": standing.gpa if standing else None,
+    }
+
+
+def _enrolled_student(reg_number, student):
+
+    if student is None:
+        return {"reg_number": reg_number, "found": False}
+
+    standing = getattr(student, "standing", None)
+    gpa = standing.gpa if standing else None
+
+    return {
+        "reg_number": reg_number,
+        "found": True,
+        "name": student.user.get_full_name(),
+        "program": student.program,
+        "year": student.year,
+        "gpa": gpa,
+        "classification": classify_gpa(gpa) if gpa is not None else None,
+    }
+
+
+@csrf_exempt
+@require_POST
+@replica_view
+def verify_transcripts_api(request):
     """
+    POST {"tokens": [...], "reg_numbers": [...]}
 
-    elements.append(Paragraph(signature_block, styles["Normal"]))
+    Tokens (from transcript QR codes) can be checked by anyone. Reg
+    number lookups carry no proof of a transcript, so they need a staff
+    login. Everything resolves in one IN query.
+    """
 
-    # =====================================================
-    # BUILD PDF
-    # =====================================================
-    document.build(elements)
+    if rate_limited(client_id(request)):
+        response = JsonResponse({"error": "Rate limit exceeded. Try again shortly."}, status=429)
+        response["Retry-After"] = str(RATE_WINDOW_SECONDS)
+        return response
+
+    try:
+        payload = json.loads(request.body)
+        tokens = payload.get("tokens", [])
+        reg_numbers = payload.get("reg_numbers", [])
+    except (ValueError, AttributeError):
+        return JsonResponse({"error": "Body must be a JSON object."}, status=400)
+
+    if not all(isinstance(value, list) and all(isinstance(item, str) for item in value)
+               for value in (tokens, reg_numbers)):
+        return JsonResponse({"error": "tokens and reg_numbers must be lists of strings."}, status=400)
+
+    if len(tokens) + len(reg_numbers) > settings.VERIFY_BATCH_MAX:
+        return JsonResponse(
+            {"error": f"At most {settings.VERIFY_BATCH_MAX} tokens and reg numbers per request."},
+            status=400
+        )
 
-    buffer.seek(0)
+    if reg_numbers and not request.user.is_staff:
+        return JsonResponse({"error": "Reg number lookups require a staff login."}, status=403)
 
-    response = HttpResponse(buffer, content_type="application/pdf")
-    response["Content-Disposition"] = (
-        f'attachment; filename="Transcript_{student.reg_number}.pdf"'
+    # Signatures are checked in-process; only valid tokens reach the database
+    issued = [(token, read_token(token)) for token in tokens]
+
+    students = students_by_reg_number(
+        {details["reg_number"] for _, details in issued if details} | set(reg_numbers)
     )
 
-    return response
+    return JsonResponse({
+        "transcripts": [
+            _verified_transcript(token, details, details and students.get(details["reg_number"]))
+            for token, details in issued
+        ],
+        "students": [
+            _enrolled_student(reg_number, students.get(reg_number))
+            for reg_number in reg_numbers
+        ],
+    })
+
+
 # =====================================================
 # DOWNLOAD CSV TEMPLATE
 # =====================================================
@@ -553,13 +691,184 @@ def export_transcript_pdf(request):
 @staff_member_required
 def download_results_template(request):
 
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename="results_template.csv"'
+    course_code = request.GET.get("course", "").strip()
+    semester_id = request.GET.get("semester", "").strip()
+    year = request.GET.get("year", "").strip()
+    file_format = "xlsx" if request.GET.get("format") == "xlsx" else "csv"
 
-    writer = csv.writer(response)
-    writer.writerow(["reg_number", "course", "semester", "marks"])
+    # No course/semester chosen: blank template with headers only
+    if not (course_code and semester_id):
+        response = HttpResponse(content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="results_template.csv"'
 
-    return response
+        writer = csv.writer(response)
+        writer.writerow(TEMPLATE_HEADER)
+
+        return response
+
+    program = request.GET.get("program", "").strip()
+
+    # Without both, "expected students" would be guesswork across cohorts
+    if not (program and year):
+        messages.error(request, "Pick a program and year of study for a pre-filled template.")
+        return redirect("portal:upload_results")
+
+    if not semester_id.isdigit() or not year.isdigit():
+        messages.error(request, "Semester and year must be valid numbers.")
+        return redirect("portal:upload_results")
+
+    course = get_object_or_404(Course, code__iexact=course_code)
+    semester = get_object_or_404(Semester, pk=semester_id)
+
+    roster = template_roster(course, semester, program, int(year))
+
+    return streaming_export(
+        request,
+        TEMPLATE_HEADER,
+        template_rows(roster, course, semester),
+        atemplate_rows(roster, course, semester),
+        file_format,
+        f"results_{course.code}_{semester.id}",
+    )
+# =====================================================
+# EXPORT RESULTS (CSV / EXCEL)
+# =====================================================
+
+@staff_member_required
+@replica_view
+def export_results(request):
+
+    file_format = request.GET.get("format", "")
+
+    if file_format not in ("csv", "xlsx"):
+        return render(request, "portal/export_excel.html", {
+            "courses": Course.objects.all(),
+            "semesters": Semester.objects.all(),
+            "now": timezone.now(),
+        })
+
+    semester = request.GET.get("semester", "").strip()
+    year = request.GET.get("year", "").strip()
+
+    if (semester and not semester.isdigit()) or (year and not year.isdigit()):
+        messages.error(request, "Semester and year must be valid numbers.")
+        return redirect("portal:export_results")
+
+    results = filter_results(
+        semester=semester,
+        course=request.GET.get("course", "").strip(),
+        program=request.GET.get("program", "").strip(),
+        year=year,
+    )
+
+    return export_response(request, results, file_format, "results_export")
+
+
+# =====================================================
+# COURSE ANALYTICS (STAFF ONLY)
+# =====================================================
+
+def _course_analytics(request):
+    """Cached per-course statistics, narrowed by ?course=<code>&semester=<id>."""
+    course_code = request.GET.get("course", "").strip()
+    semester = request.GET.get("semester", "").strip()
+
+    course_id = None
+    if course_code:
+        course = Course.objects.filter(code__iexact=course_code).first()
+        if course is None:
+            return []
+        course_id = course.id
+
+    stats = course_stats(course_id)
+
+    if semester.isdigit():
+        stats = [s for s in stats if s["semester_id"] == int(semester)]
+
+    return stats
+
+
+@staff_member_required
+@replica_view
+def course_analytics(request):
+
+    return render(request, "portal/course_analytics.html", {
+        "stats": _page(_course_analytics(request), 25, request.GET.get("page")),
+        "grades": [letter for letter, _ in GRADE_BANDS],
+        "courses": Course.objects.all(),
+        "semesters": Semester.objects.all(),
+    })
+
+
+@staff_member_required
+@replica_view
+def course_analytics_api(request):
+
+    return JsonResponse({"results": _course_analytics(request)})
+
+
+AT_RISK_FLAGS = {
+    "gpa": Q(low_gpa=True),
+    "repeat": Q(repeat_count__gt=0) | Q(unsupplementable_count__gt=0),
+    "drop": Q(gpa_drop__gte=GPA_DROP_THRESHOLD),
+}
+
+
+@staff_member_required
+@replica_view
+def at_risk_report(request):
+
+    program = request.GET.get("program", "").strip()
+    year = request.GET.get("year", "").strip()
+    flag = request.GET.get("flag", "")
+
+    standings = StudentStanding.objects.filter(is_at_risk=True)
+
+    if program:
+        standings = standings.filter(program=program)
+    if year.isdigit():
+        standings = standings.filter(year=int(year))
+    if flag in AT_RISK_FLAGS:
+        standings = standings.filter(AT_RISK_FLAGS[flag])
+
+    standings = standings.select_related("student__user").order_by("gpa", "student_id")
+
+    return render(request, "portal/at_risk.html", {
+        "standings": _page(standings, 25, request.GET.get("page")),
+        "programs": StudentStanding.objects.filter(is_at_risk=True).values_list(
+            "program", flat=True
+        ).distinct().order_by("program"),
+        "gpa_threshold": AT_RISK_GPA,
+        "drop_threshold": GPA_DROP_THRESHOLD,
+    })
+
+
+@staff_member_required
+@replica_view
+def cohort_trends(request):
+
+    program = request.GET.get("program", "").strip()
+    year = request.GET.get("year", "").strip()
+    course = request.GET.get("course", "").strip()
+    semester = request.GET.get("semester", "").strip()
+
+    if (year and not year.isdigit()) or (semester and not semester.isdigit()):
+        messages.error(request, "Semester and year must be valid numbers.")
+        return redirect("portal:cohort_trends")
+
+    last_refresh = ResultRollup.objects.order_by("-refreshed_at").values_list(
+        "refreshed_at", flat=True
+    ).first()
+
+    return render(request, "portal/cohort_trends.html", {
+        "trend": semester_trend(program, year, course),
+        "cohorts": cohort_comparison(semester, course),
+        "grades": [letter for letter, _ in GRADE_BANDS],
+        "courses": Course.objects.all(),
+        "semesters": Semester.objects.all(),
+        "programs": ResultRollup.objects.values_list("program", flat=True).distinct().order_by("program"),
+        "last_refresh": last_refresh,
+    })
 # =====================================================
 # STUDENT PROFILE
 # =====================================================
@@ -0,0 +1,58 @@
+"""
+portal/xlsxstream.py
+Streaming XLSX Reader
+
+The first worksheet is read with openpyxl in read-only mode and
+values_only iteration, so rows are parsed from the zipped sheet XML
+one at a time instead of loading the workbook into memory. Rows come
+out like portal.csvstream.read_csv: dicts of text keyed by the
+lower-cased header.
+"""
+
+import datetime
+import zipfile
+
+
+class InvalidWorkbook(ValueError):
+    """The file is not an .xlsx workbook openpyxl can read."""
+
+
+def cell_text(value):
+    if value is None:
+        return ""
+    # Excel stores every number as a float: 65.0 -> "65", 2024001.0 -> "2024001"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
+
+
+def read_xlsx(file):
+    # Imported on first use so workers do not pay for openpyxl at startup
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError) as e:
+        raise InvalidWorkbook(f"not a valid Excel workbook ({e})")
+
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [cell_text(name).strip().lower() for name in header]
+
+        for values in rows:
+            values = [cell_text(value) for value in values]
+            if not any(value.strip() for value in values):
+                continue
+            row = dict(zip(header, values))
+            for name in header[len(values):]:
+                row[name] = None
+            yield row
+    finally:
+        workbook.close()